@@ -0,0 +1,51 @@
+"""Admission control for public write paths: per-client rate limits and a concurrency cap"""
+import math
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets refilled at rate tokens per second, up to burst
+
+    Buckets live in an LRU map bounded by max_keys, so a flood from many
+    distinct addresses cannot grow memory without limit; an evicted key
+    simply starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+
+    def acquire(self, key: str):
+        """Take one token for key; returns (allowed, seconds until a token is available)"""
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self.buckets[key] = (tokens, now)
+        if len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        if allowed:
+            return True, 0
+        return False, math.ceil((1 - tokens) / self.rate)
+
+
+class ConcurrencyLimiter:
+    """Non-blocking cap on work in flight: callers over the cap are turned away at once"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+
+    def try_acquire(self):
+        if self.in_flight >= self.limit:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
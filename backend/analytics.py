@@ -0,0 +1,72 @@
+"""Cross-tabs and time series over report columns, built with pandas
+
+build_analytics runs in a worker process, so this module must stay cheap to
+import and only take and return plain picklable data.
+"""
+import pandas as pd
+
+
+# Columns pulled from the database, in the order build_analytics expects them
+ANALYTICS_FIELDS = ("created_at", "bullying_type", "class_name", "age")
+
+
+def weekly_series(frame):
+    """Reports per week (weeks start on Monday, UTC) for each bullying type"""
+    created = frame["created_at"]
+    week = (created - pd.to_timedelta(created.dt.weekday, unit="D")).dt.normalize()
+    table = pd.crosstab(week, frame["bullying_type"])
+    # Weeks without any report still get a zero row, so the series has no gaps
+    table = table.reindex(pd.date_range(table.index.min(), table.index.max(), freq="7D"), fill_value=0)
+    return {
+        "weeks": [day.date().isoformat() for day in table.index],
+        "series": {column: table[column].tolist() for column in table.columns},
+    }
+
+
+def class_type_heatmap(frame):
+    """Report counts with one row per class_name and one column per bullying type"""
+    table = pd.crosstab(frame["class_name"], frame["bullying_type"])
+    return {
+        "classes": table.index.tolist(),
+        "types": table.columns.tolist(),
+        "counts": table.to_numpy().tolist(),
+    }
+
+
+def age_distribution(frame):
+    ages = frame["age"]
+    counts = ages.value_counts().sort_index()
+    return {
+        "ages": counts.index.tolist(),
+        "counts": counts.tolist(),
+        "mean": round(float(ages.mean()), 2),
+        "median": float(ages.median()),
+    }
+
+
+def build_analytics(columns):
+    """Build the analytics response from column lists keyed by ANALYTICS_FIELDS
+
+    created_at holds POSIX timestamps in seconds.
+    """
+    total = len(columns["created_at"])
+    if not total:
+        return {
+            "total_reports": 0,
+            "weekly_by_type": {"weeks": [], "series": {}},
+            "class_type_heatmap": {"classes": [], "types": [], "counts": []},
+            "age_distribution": {"ages": [], "counts": [], "mean": None, "median": None},
+        }
+
+    frame = pd.DataFrame({
+        "created_at": pd.to_datetime(columns["created_at"], unit="s", utc=True),
+        "bullying_type": pd.Categorical(columns["bullying_type"]),
+        "class_name": pd.Categorical(columns["class_name"]),
+        "age": pd.array(columns["age"], dtype="int64"),
+    })
+    return {
+        "total_reports": total,
+        "weekly_by_type": weekly_series(frame),
+        "class_type_heatmap": class_type_heatmap(frame),
+        "age_distribution": age_distribution(frame),
+    }
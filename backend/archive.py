@@ -0,0 +1,131 @@
+"""Hot/cold tiering: move long-resolved reports out of the hot collection"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReplaceOne
+
+
+logger = logging.getLogger(__name__)
+
+# Age after which an in-flight archive copy is treated as left by a dead run
+STALE_COPY_AGE = timedelta(minutes=15)
+
+
+def archivable(older_than: timedelta):
+    """Reports resolved, and left untouched, for longer than older_than"""
+    return {"status": "resolved", "updated_at": {"$lt": datetime.now(timezone.utc) - older_than}}
+
+
+async def discard_stale_copies(hot, archive):
+    """Remove archive copies left by an interrupted run whose report is still hot
+
+    Copies are flagged with the time they were written until the batch has
+    been deleted from hot. A flag older than STALE_COPY_AGE means that run
+    died in between: if the report is still hot (the delete never ran, or it
+    was reopened meanwhile) the hot document is the live one and the copy is
+    dropped; otherwise the move completed and only the flag is cleared.
+    Younger flags may belong to another worker's batch in flight.
+    """
+    stale = {"archiving": {"$lt": datetime.now(timezone.utc) - STALE_COPY_AGE}}
+    copied = [document["_id"] async for document in archive.find(stale, {"_id": 1})]
+    if not copied:
+        return 0
+    kept = [document["_id"] async for document in hot.find({"_id": {"$in": copied}}, {"_id": 1})]
+    if kept:
+        await archive.delete_many({"_id": {"$in": kept}, **stale})
+    await archive.update_many(
+        {"_id": {"$in": copied}, **stale},
+        {"$unset": {"archiving": ""}, "$set": {"archived_at": datetime.now(timezone.utc)}},
+    )
+    logger.info(f"Dropped {len(kept)} stale archive copies of reports that are still hot")
+    return len(kept)
+
+
+async def archive_resolved_reports(hot, archive, older_than: timedelta, batch_size: int = 500):
+    """Move archivable reports from hot to archive, one batch at a time
+
+    Each batch is copied with idempotent upserts on _id, flagged as in
+    flight, before it is deleted from hot, so a report is never lost. The
+    delete is guarded on the archivable filter: a report reopened after it
+    was copied stays hot and its copy is removed right away. If the process
+    dies between copy and delete, the next run's discard_stale_copies drops
+    the copies whose report is still hot, so no report stays in both
+    collections. Once a copy's move is complete it is stamped archived_at,
+    which the changes feed hands out as a removal. Returns the report ids
+    moved.
+    """
+    await discard_stale_copies(hot, archive)
+    moved = []
+    while True:
+        query = archivable(older_than)
+        batch = await hot.find(query).sort("updated_at", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+
+        ids = [document["_id"] for document in batch]
+        copied_at = datetime.now(timezone.utc)
+        await archive.bulk_write(
+            [ReplaceOne({"_id": document["_id"]}, {**document, "archiving": copied_at}, upsert=True) for document in batch],
+            ordered=False,
+        )
+        result = await hot.delete_many({**query, "_id": {"$in": ids}})
+        kept = set()
+        if result.deleted_count < len(ids):
+            kept = {document["_id"] async for document in hot.find({"_id": {"$in": ids}}, {"_id": 1})}
+            await archive.delete_many({"_id": {"$in": list(kept)}})
+        await archive.update_many(
+            {"_id": {"$in": ids}, "archiving": copied_at},
+            {"$unset": {"archiving": ""}, "$set": {"archived_at": datetime.now(timezone.utc)}},
+        )
+        moved.extend(document["id"] for document in batch if document["_id"] not in kept)
+        logger.info(f"Archived {len(moved)} resolved reports so far")
+
+    return moved
+
+
+async def restore_archived_reports(hot, archive, changes):
+    """Move archived reports back to hot with changes applied, keyed by report id
+
+    Used when staff change a report that has been archived: it is live
+    again, so it belongs in the hot collection. The archive copies are
+    flagged as in flight before the hot copies are written, so if the
+    process dies in between discard_stale_copies later drops whichever copy
+    is redundant. Returns the restored documents.
+    """
+    flagged_at = datetime.now(timezone.utc)
+    await archive.update_many({"id": {"$in": list(changes)}}, {"$set": {"archiving": flagged_at}})
+    documents = await archive.find(
+        {"id": {"$in": list(changes)}, "archiving": flagged_at}, {"archiving": 0, "archived_at": 0}
+    ).to_list(len(changes))
+    if not documents:
+        return []
+
+    restored = [{**document, **changes[document["id"]]} for document in documents]
+    await hot.bulk_write(
+        [ReplaceOne({"_id": document["_id"]}, document, upsert=True) for document in restored], ordered=False
+    )
+    await archive.delete_many({"_id": {"$in": [document["_id"] for document in restored]}, "archiving": flagged_at})
+    logger.info(f"Restored {len(restored)} archived reports")
+    return restored
+
+
+async def archive_periodically(hot, archive, older_than: timedelta, batch_size: int, interval: float, on_archived=None):
+    """Run the archiver every interval seconds until cancelled
+
+    Several workers may run this at once; the copy and the guarded delete
+    are both idempotent, so they only repeat each other's work. on_archived
+    is awaited with the ids of the reports moved.
+    """
+    while True:
+        try:
+            moved = await archive_resolved_reports(hot, archive, older_than, batch_size)
+            if moved:
+                logger.info(f"Moved {len(moved)} resolved reports to {archive.name}")
+                if on_archived is not None:
+                    await on_archived(moved)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error archiving reports: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,230 @@
+"""Evidence attachments: streamed multipart uploads into GridFS and ranged downloads"""
+import re
+import uuid
+from datetime import datetime, timezone
+
+from multipart.exceptions import ParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+
+# GridFS bucket holding attachment files; its files collection is indexed on
+# metadata.report_id (see indexes.py)
+ATTACHMENTS_BUCKET = "report_attachments"
+
+# Bytes collected before the file signature is checked
+SNIFF_BYTES = 16
+
+# Content types recognised from the first bytes of a file. The type a client
+# declares is ignored, so a renamed executable cannot pass as a screenshot.
+SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+)
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+# Largest set of headers accepted on one multipart part
+MAX_PART_HEADER_BYTES = 16 * 1024
+
+
+class AttachmentRejected(Exception):
+    """An upload or download request that cannot be served, with the HTTP status to answer"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def sniff_content_type(head: bytes):
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+class MultipartFileReader:
+    """Pull one file field out of a multipart/form-data body as it streams in
+
+    Only the parser's callbacks for the current network chunk are held in
+    memory, never the whole file. filename is set once the field's headers
+    have been read, i.e. before its first chunk is yielded. Part headers are
+    capped at MAX_PART_HEADER_BYTES and the whole body at max_bytes, which
+    also bounds chunked bodies that carry no Content-Length.
+    """
+
+    def __init__(self, request, field_name: str = "file", max_bytes: int = None):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise AttachmentRejected(400, "Expected a multipart/form-data body")
+        self.request = request
+        self.field_name = field_name
+        self.max_bytes = max_bytes
+        self.filename = None
+        self.events = []
+        self.headers = {}
+        self.header_bytes = 0
+        self.header_field = b""
+        self.header_value = b""
+        self.parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": lambda: self.events.append(("headers", self.headers)),
+            "on_part_data": lambda data, start, end: self.events.append(("data", data[start:end])),
+            "on_part_end": lambda: self.events.append(("end", None)),
+        })
+
+    def on_part_begin(self):
+        self.headers = {}
+        self.header_bytes = 0
+
+    def count_header_bytes(self, size: int):
+        self.header_bytes += size
+        if self.header_bytes > MAX_PART_HEADER_BYTES:
+            raise AttachmentRejected(413, f"Part headers are limited to {MAX_PART_HEADER_BYTES} bytes")
+
+    def on_header_field(self, data, start, end):
+        self.count_header_bytes(end - start)
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self.count_header_bytes(end - start)
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        self.headers[self.header_field.lower()] = self.header_value
+        self.header_field = b""
+        self.header_value = b""
+
+    def write(self, chunk):
+        """Feed the parser a chunk, or finalize it on None"""
+        try:
+            if chunk is None:
+                self.parser.finalize()
+            else:
+                self.parser.write(chunk)
+        except ParseError as e:
+            raise AttachmentRejected(400, f"Malformed multipart body: {e}")
+
+    async def parsed_events(self):
+        received = 0
+        async for chunk in self.request.stream():
+            received += len(chunk)
+            if self.max_bytes is not None and received > self.max_bytes:
+                raise AttachmentRejected(413, f"Upload bodies are limited to {self.max_bytes} bytes")
+            self.write(chunk)
+            events, self.events = self.events, []
+            for event in events:
+                yield event
+        self.write(None)
+        for event in self.events:
+            yield event
+
+    async def chunks(self):
+        """Yield the file field's data; stops at the end of that part"""
+        in_file = False
+        async for kind, value in self.parsed_events():
+            if kind == "headers":
+                _, params = parse_options_header(value.get(b"content-disposition", b""))
+                if params.get(b"name") == self.field_name.encode() and b"filename" in params:
+                    in_file = True
+                    self.filename = params[b"filename"].decode("utf-8", "replace")
+            elif kind == "data" and in_file:
+                yield value
+            elif kind == "end" and in_file:
+                return
+        if not in_file:
+            raise AttachmentRejected(400, f"Missing file field '{self.field_name}'")
+
+
+async def store_attachment(bucket, reader: MultipartFileReader, report_id: str, max_bytes: int, allowed_types):
+    """Stream the uploaded file into GridFS, enforcing type and size as it arrives
+
+    At most one network chunk plus one GridFS chunk is held in memory. An
+    oversized or rejected upload is aborted, which deletes the chunks
+    already written. Returns the stored file's description.
+    """
+    chunks = reader.chunks()
+    head = b""
+    async for data in chunks:
+        head += data
+        if len(head) >= SNIFF_BYTES:
+            break
+    if not head:
+        raise AttachmentRejected(400, "The uploaded file is empty")
+    content_type = sniff_content_type(head)
+    if content_type not in allowed_types:
+        raise AttachmentRejected(415, f"Only these file types are accepted: {', '.join(sorted(allowed_types))}")
+
+    attachment_id = str(uuid.uuid4())
+    filename = reader.filename or "attachment"
+    metadata = {"report_id": report_id, "content_type": content_type}
+    grid_in = bucket.open_upload_stream_with_id(attachment_id, filename, metadata=metadata)
+    size = 0
+    try:
+        data = head
+        while data is not None:
+            size += len(data)
+            if size > max_bytes:
+                raise AttachmentRejected(413, f"Attachments are limited to {max_bytes} bytes")
+            await grid_in.write(data)
+            data = await anext(chunks, None)
+        await grid_in.close()
+    except BaseException:
+        await grid_in.abort()
+        raise
+    return attachment_description({
+        "_id": attachment_id, "filename": filename, "length": size,
+        "uploadDate": datetime.now(timezone.utc), "metadata": metadata,
+    })
+
+
+def attachment_description(file_document):
+    """API view of a GridFS files document"""
+    return {
+        "id": file_document["_id"],
+        "report_id": file_document["metadata"]["report_id"],
+        "filename": file_document["filename"],
+        "content_type": file_document["metadata"]["content_type"],
+        "size": file_document["length"],
+        "uploaded_at": file_document["uploadDate"],
+    }
+
+
+def parse_range(header, size: int):
+    """(start, end) inclusive for a single "bytes=" range, or None for the whole file
+
+    Multi-range and malformed headers are ignored, as RFC 9110 allows;
+    a range starting past the end raises a 416.
+    """
+    match = RANGE_PATTERN.fullmatch(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise AttachmentRejected(416, "Requested range not satisfiable")
+    return start, end
+
+
+async def read_range(grid_out, start: int, end: int, chunk_size: int):
+    """Yield bytes start..end (inclusive) of a GridFS file"""
+    grid_out.seek(start)
+    remaining = end - start + 1
+    while remaining > 0:
+        data = await grid_out.read(min(remaining, chunk_size))
+        if not data:
+            break
+        remaining -= len(data)
+        yield data
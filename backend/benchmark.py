@@ -0,0 +1,268 @@
+"""Offline load benchmark for the API, driven in-process over ASGI
+
+Seeds the reports collection at increasing sizes and measures throughput and
+latency percentiles for each route, without a running server or network hop.
+
+    python benchmark.py --backend memory
+    python benchmark.py --backend mongo --mongo-url mongodb://localhost:27017 --output bench.json
+    python benchmark.py --backend mongo --compare bench.json
+
+The mongo backend uses a throwaway database on the given server, drops it
+afterwards, and is the one to measure with: it shows how queries scale with
+collection size. The memory backend needs mongomock-motor and is only a smoke
+run. mongomock scans and copies every document on each query, so its numbers
+are dominated by that scan, grow linearly with size, and say little about the
+application; sizes are capped at MEMORY_MAX_SIZE, and routes it cannot
+execute are skipped.
+
+Like the server, analytics run in a process pool of ANALYTICS_WORKERS.
+"""
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+import httpx
+import typer
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'benchmark')
+os.environ.setdefault('EVENTS_SOURCE', 'local')
+# One in-process client would otherwise hit the per-client submission limit at once
+os.environ.setdefault('REPORT_RATE_PER_MINUTE', '1000000000')
+os.environ.setdefault('REPORT_RATE_BURST', '1000000000')
+
+import server  # noqa: E402
+from indexes import ensure_indexes  # noqa: E402
+
+
+cli = typer.Typer(help=__doc__, add_completion=False)
+
+SEED_BATCH_SIZE = 10000
+DEFAULT_SIZES = {"memory": "100,500", "mongo": "10000,100000,1000000"}
+# Past this, one mongomock query takes seconds and a run does not finish
+MEMORY_MAX_SIZE = 2000
+# mongomock does not implement the $substrCP projection the summary view uses
+MEMORY_UNSUPPORTED_ROUTES = {"list_summary_view"}
+CLASS_NAMES = [f"{grade}º {section}" for grade in range(1, 10) for section in "ABCD"]
+LOCATIONS = ["Pátio", "Sala de aula", "Refeitório", "Quadra", "Banheiro", "Redes sociais", "Corredor"]
+WORDS = ("colegas apelidos recreio intervalo empurrão grupo whatsapp fotos ameaça "
+         "exclusão provocação sala professor saída ônibus").split()
+
+
+def make_report(created_at: datetime):
+    is_anonymous = random.random() < 0.4
+    return {
+        "id": str(uuid.uuid4()),
+        "name": None if is_anonymous else "Estudante Teste",
+        "age": random.randint(10, 18),
+        "class_name": random.choice(CLASS_NAMES),
+        "bullying_type": random.choice([t.value for t in server.BullyingType]),
+        "date_occurred": created_at.date().isoformat(),
+        "location": random.choice(LOCATIONS),
+        "description": " ".join(random.choices(WORDS, k=random.randint(20, 120))),
+        "is_anonymous": is_anonymous,
+        "status": random.choices([s.value for s in server.ReportStatus], weights=[5, 2, 3])[0],
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+async def seed(db, current: int, target: int):
+    """Grow the collection from current to target reports; returns a sample of ids"""
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    ids = []
+    for offset in range(current, target, SEED_BATCH_SIZE):
+        batch = [make_report(start + timedelta(minutes=i)) for i in range(offset, min(offset + SEED_BATCH_SIZE, target))]
+        await db.bullying_reports.insert_many(batch, ordered=False)
+        ids.extend(report["id"] for report in random.sample(batch, min(len(batch), 100)))
+    return ids
+
+
+def percentile(sorted_values, fraction: float):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def measure(client: httpx.AsyncClient, make_request, requests: int, concurrency: int, before=None):
+    """Fire requests with bounded concurrency and summarise their latencies"""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            if before:
+                before()
+            method, url, kwargs = make_request()
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+    }
+
+
+def route_scenarios(ids):
+    new_report = {
+        "age": 14, "class_name": "8º A", "bullying_type": "verbal", "date_occurred": "2024-03-01",
+        "location": "Pátio", "description": "Relato de benchmark.", "is_anonymous": True,
+    }
+    statuses = [status.value for status in server.ReportStatus]
+    return {
+        "create": (lambda: ("POST", "/api/reports", {"json": new_report}), None),
+        "list": (lambda: ("GET", "/api/reports", {"params": {"limit": 50}}), None),
+        "list_filtered": (lambda: ("GET", "/api/reports", {"params": {"limit": 50, "status": "pending"}}), None),
+        "list_summary_view": (lambda: ("GET", "/api/reports", {"params": {"limit": 50, "view": "summary"}}), None),
+        "list_sparse_fields": (lambda: ("GET", "/api/reports", {"params": {"limit": 50, "fields": "status,class_name"}}), None),
+        "get": (lambda: ("GET", f"/api/reports/{random.choice(ids)}", {}), None),
+        "status_update": (
+            lambda: ("PUT", f"/api/reports/{random.choice(ids)}/status", {"json": {"status": random.choice(statuses)}}),
+            None,
+        ),
+        "summary": (lambda: ("GET", "/api/reports/stats/summary", {}), None),
+        "summary_uncached": (lambda: ("GET", "/api/reports/stats/summary", {}), server.summary_cache.clear),
+        "analytics_uncached": (lambda: ("GET", "/api/reports/analytics", {}), server.analytics_cache.clear),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def open_backend(backend: str, mongo_url: str):
+    if backend == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise typer.BadParameter("the memory backend needs mongomock-motor (pip install mongomock-motor)")
+        return AsyncMongoMockClient(), "benchmark"
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(mongo_url, tz_aware=True), f"benchmark_{uuid.uuid4().hex[:8]}"
+
+
+async def run_benchmark(backend, mongo_url, sizes, requests, concurrency, routes):
+    client, db_name = open_backend(backend, mongo_url)
+    server.mongo.client = client
+    server.mongo.db = client[db_name]
+    db = server.mongo.db
+    results = []
+    # The ASGI transport does not run the app lifespan, so start the pool it would
+    server.start_analytics_pool()
+    try:
+        await ensure_indexes(db)
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as http:
+            current = 0
+            ids = []
+            for size in sizes:
+                typer.echo(f"Seeding {size} reports...")
+                ids.extend(await seed(db, current, size))
+                current = size
+                for route, (make_request, before) in route_scenarios(ids).items():
+                    if routes and route not in routes:
+                        continue
+                    if backend == "memory" and route in MEMORY_UNSUPPORTED_ROUTES:
+                        continue
+                    # Warm up caches and connection pools before measuring
+                    await measure(http, make_request, min(10, requests), 1, before)
+                    stats = await measure(http, make_request, requests, concurrency, before)
+                    results.append({"size": size, "route": route, **stats})
+                    typer.echo(
+                        f"  {route:<18} {stats['throughput_rps']:>9} req/s  "
+                        f"p50 {stats['p50_ms']:>8}ms  p95 {stats['p95_ms']:>8}ms  p99 {stats['p99_ms']:>8}ms"
+                        + (f"  errors {stats['errors']}" if stats['errors'] else "")
+                    )
+    finally:
+        server.stop_analytics_pool()
+        if backend == "mongo":
+            await client.drop_database(db_name)
+        client.close()
+    return results
+
+
+def compare(results, baseline_path: Path):
+    baseline = {(r["size"], r["route"]): r for r in json.loads(baseline_path.read_text())["results"]}
+    typer.echo(f"\nChange in p95 against {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result["size"], result["route"]))
+        if previous and previous["p95_ms"]:
+            change = (result["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100
+            typer.echo(f"  {result['size']:>8} {result['route']:<18} {change:+7.1f}%")
+
+
+@cli.command()
+def main(
+    backend: str = typer.Option("memory", help="memory (mongomock-motor) or mongo"),
+    mongo_url: str = typer.Option("mongodb://localhost:27017", help="Server for the mongo backend"),
+    sizes: str = typer.Option(
+        None, help=f"Comma-separated collection sizes to seed (default: {DEFAULT_SIZES['memory']} for memory, "
+        f"{DEFAULT_SIZES['mongo']} for mongo)"
+    ),
+    requests: int = typer.Option(200, min=1, help="Requests per route and size"),
+    concurrency: int = typer.Option(8, min=1, help="Requests in flight at once"),
+    route: List[str] = typer.Option([], help="Only run these routes (repeatable)"),
+    output: Path = typer.Option(None, help="Write results as JSON to this file"),
+    baseline: Path = typer.Option(None, "--compare", help="Results JSON from an earlier run to compare with"),
+    seed_value: int = typer.Option(42, "--seed", help="Random seed for generated data"),
+):
+    if backend not in ("memory", "mongo"):
+        raise typer.BadParameter("backend must be memory or mongo")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    random.seed(seed_value)
+    size_list = sorted(int(size) for size in (sizes or DEFAULT_SIZES[backend]).split(','))
+    if backend == "memory" and size_list[-1] > MEMORY_MAX_SIZE:
+        raise typer.BadParameter(
+            f"the memory backend cannot seed more than {MEMORY_MAX_SIZE} reports; use --backend mongo", param_hint="--sizes"
+        )
+    results = asyncio.run(run_benchmark(backend, mongo_url, size_list, requests, concurrency, set(route)))
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "backend": backend,
+            "python": platform.python_version(),
+            "requests": requests,
+            "concurrency": concurrency,
+        },
+        "results": results,
+    }
+    if output:
+        output.write_text(json.dumps(report, indent=2))
+        typer.echo(f"Results written to {output}")
+    if baseline:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    cli()
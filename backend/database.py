@@ -0,0 +1,155 @@
+"""MongoDB client lifecycle, pool configuration and pool statistics"""
+import os
+import threading
+import time
+from typing import List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import BaseModel
+from pymongo import monitoring
+
+
+class MongoSettings(BaseModel):
+    url: str
+    db_name: str
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    max_idle_time_ms: Optional[int] = None
+    wait_queue_timeout_ms: Optional[int] = None
+    server_selection_timeout_ms: int = 5000
+    connect_timeout_ms: int = 10000
+    socket_timeout_ms: Optional[int] = None
+    # zlib ships with Python; snappy and zstd need python-snappy / zstandard
+    compressors: List[str] = []
+
+    @classmethod
+    def from_env(cls):
+        def optional_int(name):
+            value = os.environ.get(name)
+            return int(value) if value else None
+
+        compressors = os.environ.get('MONGO_COMPRESSORS', '')
+        return cls(
+            url=os.environ['MONGO_URL'],
+            db_name=os.environ['DB_NAME'],
+            max_pool_size=int(os.environ.get('MONGO_MAX_POOL_SIZE', 100)),
+            min_pool_size=int(os.environ.get('MONGO_MIN_POOL_SIZE', 0)),
+            max_idle_time_ms=optional_int('MONGO_MAX_IDLE_TIME_MS'),
+            wait_queue_timeout_ms=optional_int('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+            server_selection_timeout_ms=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+            connect_timeout_ms=int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 10000)),
+            socket_timeout_ms=optional_int('MONGO_SOCKET_TIMEOUT_MS'),
+            compressors=[name.strip() for name in compressors.split(',') if name.strip()],
+        )
+
+    def client_options(self):
+        options = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "socketTimeoutMS": self.socket_timeout_ms,
+        }
+        if self.compressors:
+            options["compressors"] = ",".join(self.compressors)
+        return {key: value for key, value in options.items() if value is not None}
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Count connection pool activity; pymongo calls these from its own threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "open_connections": self.connections_created - self.connections_closed,
+                "checked_out": self.checked_out,
+                "checkouts_total": self.checkouts,
+                "checkout_failures_total": self.checkout_failures,
+                "connections_created_total": self.connections_created,
+            }
+
+    def connection_created(self, event):
+        with self.lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self.lock:
+            self.connections_closed += 1
+
+    def connection_checked_out(self, event):
+        with self.lock:
+            self.checked_out += 1
+            self.checkouts += 1
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.checked_out -= 1
+
+    def connection_check_out_failed(self, event):
+        with self.lock:
+            self.checkout_failures += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+
+class Database:
+    """Owns the Motor client; connect() and close() are driven by the app lifespan"""
+
+    def __init__(self, settings: Optional[MongoSettings] = None):
+        self.settings = settings
+        self.pool_stats = PoolStats()
+        self.client = None
+        self.db = None
+
+    def connect(self, event_listeners=()):
+        if self.client is not None:
+            return self.db
+        if self.settings is None:
+            self.settings = MongoSettings.from_env()
+        # tz_aware so BSON dates come back as UTC datetimes rather than naive ones
+        self.client = AsyncIOMotorClient(
+            self.settings.url,
+            tz_aware=True,
+            event_listeners=[self.pool_stats, *event_listeners],
+            **self.settings.client_options(),
+        )
+        self.db = self.client[self.settings.db_name]
+        return self.db
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+            self.db = None
+
+    async def ping(self):
+        """Round-trip a ping and return its latency in milliseconds"""
+        started = time.perf_counter()
+        await self.client.admin.command("ping")
+        return (time.perf_counter() - started) * 1000
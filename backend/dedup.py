@@ -0,0 +1,81 @@
+"""MinHash signatures and LSH banding for near-duplicate report detection"""
+import hashlib
+import re
+import unicodedata
+
+import numpy as np
+
+
+NUM_PERMUTATIONS = 64
+# 16 bands of 4 rows: reports with Jaccard similarity around 0.5 or more
+# share at least one band with high probability, dissimilar ones rarely do
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 2
+
+MERSENNE_PRIME = (1 << 31) - 1
+_generator = np.random.default_rng(20240115)
+# Fixed seed: signatures stored in the database must stay comparable across restarts
+PERMUTATION_A = _generator.integers(1, MERSENNE_PRIME, NUM_PERMUTATIONS, dtype=np.int64)
+PERMUTATION_B = _generator.integers(0, MERSENNE_PRIME, NUM_PERMUTATIONS, dtype=np.int64)
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_words(text: str):
+    """Lowercase, strip accents and split into words, so "Pátio" and "patio" agree"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return WORD_PATTERN.findall(stripped)
+
+
+def shingles(description: str, class_name: str = "", date_occurred: str = ""):
+    words = normalize_words(description)
+    result = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+    if class_name:
+        result.add("class:" + " ".join(normalize_words(class_name)))
+    if date_occurred:
+        result.add("date:" + date_occurred.strip())
+    result.discard("")
+    return result
+
+
+def shingle_hashes(values):
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(value.encode(), digest_size=4).digest(), "little") & MERSENNE_PRIME
+         for value in values),
+        dtype=np.int64,
+    )
+
+
+def minhash(description: str, class_name: str = "", date_occurred: str = ""):
+    """MinHash signature of the report text as a list of NUM_PERMUTATIONS ints"""
+    hashes = shingle_hashes(shingles(description, class_name, date_occurred))
+    if hashes.size == 0:
+        return [MERSENNE_PRIME] * NUM_PERMUTATIONS
+    # (a * x + b) mod p for every permutation and shingle; fits in int64 as a, x < 2**31
+    permuted = (PERMUTATION_A[:, None] * hashes[None, :] + PERMUTATION_B[:, None]) % MERSENNE_PRIME
+    return permuted.min(axis=1).tolist()
+
+
+def lsh_bands(signature):
+    """Band keys for the LSH index: reports sharing any key are candidates"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+        keys.append(f"{band}:{digest}")
+    return keys
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity: the share of positions where two signatures agree"""
+    if not signature or not other or len(signature) != len(other):
+        return 0.0
+    return float(np.mean(np.asarray(signature) == np.asarray(other)))
+
+
+def report_signature(report):
+    """Signature fields to store alongside a report document"""
+    signature = minhash(report.get("description", ""), report.get("class_name", ""), report.get("date_occurred", ""))
+    return {"minhash": signature, "lsh_bands": lsh_bands(signature)}
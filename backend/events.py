@@ -0,0 +1,111 @@
+"""In-process fan-out of report change events for Server-Sent Events clients"""
+import asyncio
+import json
+import logging
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class ReportEventBroker:
+    """Broadcast small delta events to every connected subscriber
+
+    Each subscriber gets a bounded queue. A subscriber that falls so far
+    behind that its queue fills up is dropped with a final "resync" event,
+    telling the client to reload instead of patching from an incomplete
+    stream; a slow client never blocks writers or other subscribers.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.sequence = 0
+        # "local" publishes from the route handlers; "change_stream" from a
+        # Mongo change stream watcher, which also sees other workers' writes
+        self.source = "local"
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, event_type: str, data):
+        if not self.subscribers:
+            return
+        self.sequence += 1
+        event = (self.sequence, event_type, data)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.unsubscribe(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait((self.sequence, "resync", {}))
+                logger.warning("Dropped a slow report events subscriber")
+
+
+def format_sse(event_id: int, event_type: str, data, default=None):
+    payload = json.dumps(data, default=default, ensure_ascii=False, separators=(',', ':'))
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+
+
+def change_to_event(change, fields):
+    """Translate a change stream document into an (event_type, data) pair"""
+    operation = change["operationType"]
+    document = change.get("fullDocument") or {}
+    if operation == "insert":
+        return "report_created", {field: document.get(field) for field in fields}
+    updated = change.get("updateDescription", {}).get("updatedFields", {})
+    if operation == "update" and "status" in updated:
+        return "status_changed", {
+            "id": document.get("id"),
+            "status": updated["status"],
+            "updated_at": updated.get("updated_at", document.get("updated_at")),
+        }
+    return None
+
+
+async def watch_report_changes(collection, broker: ReportEventBroker, fields, on_change=None, retry_delay: float = 5):
+    """Feed the broker from a change stream, resuming after transient errors
+
+    Returns quietly (leaving the broker on local publishing) when the server
+    does not support change streams, e.g. a standalone mongod.
+    """
+    pipeline = [{"$match": {"operationType": {"$in": ["insert", "update"]}}}]
+    resume_token = None
+    while True:
+        try:
+            async with collection.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                if broker.source != "change_stream":
+                    logger.info("Report events are fed from the change stream")
+                broker.source = "change_stream"
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    event = change_to_event(change, fields)
+                    if event:
+                        broker.publish(*event)
+                    if on_change:
+                        on_change()
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as e:
+            if broker.source != "change_stream":
+                logger.info(f"Change streams unavailable, publishing report events locally: {e}")
+                return
+            # The resume point may have rolled off the oplog; start over and
+            # tell clients they may have missed events
+            logger.error(f"Report change stream failed, restarting: {e}")
+            resume_token = None
+            broker.publish("resync", {})
+        except PyMongoError as e:
+            logger.error(f"Report change stream failed, retrying: {e}")
+        except Exception as e:
+            logger.error(f"Report change stream stopped, publishing report events locally: {e}")
+            broker.source = "local"
+            return
+        await asyncio.sleep(retry_delay)
@@ -0,0 +1,209 @@
+"""Index declarations and query-plan checks for the reports collections"""
+import logging
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+
+logger = logging.getLogger(__name__)
+
+# Indexes every collection needs, keyed by collection name. Names are fixed so
+# that re-running the bootstrap is a no-op on an already indexed database.
+INDEXES = {
+    "bullying_reports": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="status_created_at_id",
+        ),
+        IndexModel([("updated_at", ASCENDING), ("id", ASCENDING)], name="updated_at_id"),
+        IndexModel([("status", ASCENDING), ("updated_at", ASCENDING)], name="status_updated_at"),
+        IndexModel([("bullying_type", ASCENDING)], name="bullying_type"),
+        IndexModel([("is_anonymous", ASCENDING)], name="is_anonymous"),
+        # Multikey index over the MinHash band keys: the LSH lookup for near-duplicates
+        IndexModel([("lsh_bands", ASCENDING)], name="lsh_bands"),
+        # Version 3 text indexes are case and diacritic insensitive, so
+        # "patio" matches "pátio"; Portuguese stemming handles plurals.
+        IndexModel(
+            [("description", TEXT), ("location", TEXT), ("class_name", TEXT)],
+            name="report_text",
+            default_language="portuguese",
+            language_override="text_language",
+            weights={"description": 1, "location": 3, "class_name": 3},
+        ),
+    ],
+    # Long-resolved reports moved out by the archiver; only read by id and by
+    # the opt-in include_archived listings
+    "bullying_reports_archive": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        # Only copies of a batch still being moved carry this field
+        IndexModel([("archiving", ASCENDING)], name="archiving", sparse=True),
+        # Removals handed out by the changes feed
+        IndexModel([("archived_at", ASCENDING), ("id", ASCENDING)], name="archived_at_id"),
+    ],
+    # GridFS files collection of the evidence attachments bucket
+    "report_attachments.files": [
+        IndexModel([("metadata.report_id", ASCENDING), ("uploadDate", ASCENDING)], name="report_id_upload_date"),
+    ],
+    "status_checks": [
+        IndexModel([("timestamp", DESCENDING), ("id", DESCENDING)], name="timestamp_id"),
+    ],
+}
+
+# Error code MongoDB returns when an index exists under the same name with other options
+INDEX_OPTIONS_CONFLICT = 85
+
+# Query shapes issued by the API routes, as explain commands. A placeholder
+# value stands in for request data; the planner only cares about the shape.
+SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
+SAMPLE_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+LIST_SORT = {"created_at": -1, "id": -1}
+
+QUERY_SHAPES = {
+    "get_report": {"find": "bullying_reports", "filter": {"id": SAMPLE_ID}, "limit": 1},
+    "batch_get_reports": {"find": "bullying_reports", "filter": {"id": {"$in": [SAMPLE_ID, SAMPLE_ID[::-1]]}}},
+    "update_report_status": {
+        "findAndModify": "bullying_reports",
+        "query": {"id": SAMPLE_ID},
+        "update": {"$set": {"status": "resolved"}},
+        "new": True,
+    },
+    "update_report_statuses": {
+        "update": "bullying_reports",
+        "updates": [{"q": {"id": SAMPLE_ID}, "u": {"$set": {"status": "resolved"}}}],
+    },
+    "find_similar_reports": {
+        "find": "bullying_reports",
+        "filter": {"lsh_bands": {"$in": ["0:0000000000000000", "1:0000000000000000"]}, "id": {"$ne": SAMPLE_ID}},
+        "limit": 50,
+    },
+    "get_reports": {"find": "bullying_reports", "filter": {}, "sort": LIST_SORT, "limit": 101},
+    "get_reports_next_page": {
+        "find": "bullying_reports",
+        "filter": {"$or": [
+            {"created_at": {"$lt": SAMPLE_DATE}},
+            {"created_at": SAMPLE_DATE, "id": {"$lt": SAMPLE_ID}},
+        ]},
+        "sort": LIST_SORT,
+        "limit": 101,
+    },
+    "get_reports_by_status": {
+        "find": "bullying_reports", "filter": {"status": "pending"}, "sort": LIST_SORT, "limit": 101,
+    },
+    "get_reports_by_type": {
+        "find": "bullying_reports", "filter": {"bullying_type": "verbal"}, "sort": LIST_SORT, "limit": 101,
+    },
+    "get_reports_by_anonymity": {
+        "find": "bullying_reports", "filter": {"is_anonymous": True}, "sort": LIST_SORT, "limit": 101,
+    },
+    "get_reports_created_range": {
+        "find": "bullying_reports",
+        "filter": {"created_at": {"$gte": SAMPLE_DATE}},
+        "sort": LIST_SORT,
+        "limit": 101,
+    },
+    "get_report_changes": {
+        "find": "bullying_reports",
+        "filter": {"$and": [
+            {"updated_at": {"$lt": SAMPLE_DATE}},
+            {"$or": [
+                {"updated_at": {"$gt": SAMPLE_DATE}},
+                {"updated_at": SAMPLE_DATE, "id": {"$gt": SAMPLE_ID}},
+            ]},
+        ]},
+        "sort": {"updated_at": 1, "id": 1},
+        "limit": 501,
+    },
+    "get_archived_changes": {
+        "find": "bullying_reports_archive",
+        "filter": {"$and": [
+            {"archived_at": {"$lt": SAMPLE_DATE}},
+            {"$or": [
+                {"archived_at": {"$gt": SAMPLE_DATE}},
+                {"archived_at": SAMPLE_DATE, "id": {"$gt": SAMPLE_ID}},
+            ]},
+        ]},
+        "sort": {"archived_at": 1, "id": 1},
+        "limit": 501,
+    },
+    "archive_resolved_reports": {
+        "find": "bullying_reports",
+        "filter": {"status": "resolved", "updated_at": {"$lt": SAMPLE_DATE}},
+        "sort": {"updated_at": 1},
+        "limit": 500,
+    },
+    "get_archived_report": {"find": "bullying_reports_archive", "filter": {"id": SAMPLE_ID}, "limit": 1},
+    "get_archived_reports": {"find": "bullying_reports_archive", "filter": {}, "sort": LIST_SORT, "limit": 101},
+    "list_attachments": {
+        "find": "report_attachments.files",
+        "filter": {"metadata.report_id": SAMPLE_ID},
+        "sort": {"uploadDate": 1},
+        "limit": 5,
+    },
+    "get_status_checks": {
+        "find": "status_checks",
+        "filter": {"$or": [
+            {"timestamp": {"$lt": SAMPLE_DATE}},
+            {"timestamp": SAMPLE_DATE, "id": {"$lt": SAMPLE_ID}},
+        ]},
+        "sort": {"timestamp": -1, "id": -1},
+        "limit": 101,
+    },
+    "search_reports": {
+        "find": "bullying_reports",
+        "filter": {"$text": {"$search": "recreio"}, "status": "pending"},
+        "sort": {"score": {"$meta": "textScore"}, "created_at": -1},
+        "limit": 21,
+    },
+}
+# The summary and the analytics read the whole (filtered) collection on
+# purpose and are served from in-process caches, so they are deliberately not
+# part of the COLLSCAN check.
+
+
+async def ensure_indexes(db):
+    """Create any missing index; existing indexes with the same spec are left alone"""
+    for collection, indexes in INDEXES.items():
+        names = await db[collection].create_indexes(indexes)
+        logger.info(f"Indexes ready on {collection}: {', '.join(names)}")
+
+
+async def ensure_ttl_index(db, collection: str, field: str, expire_after_seconds: int):
+    """Create a TTL index, or retune the expiry of the existing one in place"""
+    name = f"{field}_ttl"
+    try:
+        await db[collection].create_index(field, name=name, expireAfterSeconds=expire_after_seconds)
+    except OperationFailure as e:
+        if e.code != INDEX_OPTIONS_CONFLICT:
+            raise
+        await db.command({
+            "collMod": collection,
+            "index": {"name": name, "expireAfterSeconds": expire_after_seconds},
+        })
+    logger.info(f"TTL on {collection}.{field} set to {expire_after_seconds}s")
+
+
+def plan_stages(plan):
+    """Yield every stage name in an explain plan tree"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from plan_stages(value)
+
+
+async def find_collection_scans(db):
+    """Explain every route query shape and return the names of those doing a COLLSCAN"""
+    offenders = []
+    for name, command in QUERY_SHAPES.items():
+        explained = await db.command({"explain": command, "verbosity": "queryPlanner"})
+        winning_plan = explained["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in plan_stages(winning_plan):
+            offenders.append(name)
+    return offenders
@@ -0,0 +1,98 @@
+"""Maintenance commands for the Cicero Sem Bullying database
+
+Run from the backend directory, e.g. ``python manage.py check-indexes``.
+"""
+import asyncio
+from datetime import timedelta
+
+import typer
+
+from archive import archive_resolved_reports
+from indexes import ensure_indexes, ensure_ttl_index, find_collection_scans
+from migrations import backfill_report_signatures, migrate_report_dates
+from server import ARCHIVE_AFTER_DAYS, STATUS_CHECK_TTL_SECONDS, mark_reports_changed, mongo
+
+
+cli = typer.Typer(help=__doc__, no_args_is_help=True)
+
+
+def run(job):
+    """Run an async job that takes the database, with a client opened just for it"""
+    async def main():
+        db = mongo.connect()
+        try:
+            return await job(db)
+        finally:
+            mongo.close()
+
+    return asyncio.run(main())
+
+
+@cli.command("ensure-indexes")
+def ensure_indexes_command():
+    """Create the indexes required by the API routes"""
+    async def ensure(db):
+        await ensure_indexes(db)
+        await ensure_ttl_index(db, "status_checks", "timestamp", STATUS_CHECK_TTL_SECONDS)
+
+    run(ensure)
+    typer.echo("Indexes are up to date")
+
+
+@cli.command("check-indexes")
+def check_indexes_command(
+    create: bool = typer.Option(False, "--create", help="Create missing indexes before checking"),
+):
+    """Fail if any route query shape is planned as a collection scan"""
+    async def check(db):
+        if create:
+            await ensure_indexes(db)
+        return await find_collection_scans(db)
+
+    offenders = run(check)
+    if offenders:
+        for name in offenders:
+            typer.echo(f"COLLSCAN: {name}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo("All route queries use an index")
+
+
+@cli.command("migrate-dates")
+def migrate_dates_command(
+    batch_size: int = typer.Option(1000, "--batch-size", min=1, help="Documents converted per bulk write"),
+):
+    """Convert legacy ISO string report dates to native BSON dates (required once; safe to re-run)"""
+    converted, skipped = run(lambda db: migrate_report_dates(db, batch_size))
+    typer.echo(f"Converted {converted} documents, skipped {skipped} unparseable values")
+
+
+@cli.command("backfill-signatures")
+def backfill_signatures_command(
+    batch_size: int = typer.Option(1000, "--batch-size", min=1, help="Documents updated per bulk write"),
+):
+    """Store duplicate-detection signatures on older reports (safe to re-run)"""
+    updated = run(lambda db: backfill_report_signatures(db, batch_size))
+    typer.echo(f"Stored signatures on {updated} reports")
+
+
+@cli.command("archive-reports")
+def archive_reports_command(
+    older_than_days: int = typer.Option(ARCHIVE_AFTER_DAYS, "--older-than-days", min=0,
+                                        help="Archive reports resolved more than this many days ago"),
+    batch_size: int = typer.Option(500, "--batch-size", min=1, help="Reports moved per batch"),
+):
+    """Move long-resolved reports to bullying_reports_archive now, without waiting for the schedule"""
+    async def archive(db):
+        moved = await archive_resolved_reports(
+            db.bullying_reports, db.bullying_reports_archive, timedelta(days=older_than_days), batch_size
+        )
+        if moved:
+            await mark_reports_changed()
+        return len(moved)
+
+    moved = run(archive)
+    typer.echo(f"Archived {moved} reports")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,185 @@
+"""Request and MongoDB command metrics, rendered in Prometheus text format"""
+import bisect
+import threading
+import time
+
+from pymongo import monitoring
+
+
+# Seconds; spans sub-millisecond Mongo commands up to slow exports
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Counters and histograms keyed by label tuples
+
+    Updates are a dict lookup and a few integer increments under one lock,
+    so they stay cheap on every request and every database command.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.request_errors = {}
+        self.request_latency = {}
+        self.commands = {}
+        self.command_failures = {}
+        self.command_latency = {}
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float = None):
+        """Count a request, and time it unless seconds is None"""
+        with self.lock:
+            key = (method, route, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if status >= 500:
+                error_key = (method, route)
+                self.request_errors[error_key] = self.request_errors.get(error_key, 0) + 1
+            if seconds is None:
+                return
+            histogram = self.request_latency.get((method, route))
+            if histogram is None:
+                histogram = self.request_latency[(method, route)] = Histogram()
+            histogram.observe(seconds)
+
+    def observe_command(self, collection: str, command: str, seconds: float, failed: bool):
+        with self.lock:
+            key = (collection, command)
+            self.commands[key] = self.commands.get(key, 0) + 1
+            if failed:
+                self.command_failures[key] = self.command_failures.get(key, 0) + 1
+            histogram = self.command_latency.get(key)
+            if histogram is None:
+                histogram = self.command_latency[key] = Histogram()
+            histogram.observe(seconds)
+
+    def render(self, gauges=None):
+        """Prometheus text exposition of everything recorded so far"""
+        with self.lock:
+            lines = []
+            render_counter(lines, "http_requests_total", "HTTP requests by route and status code",
+                           ("method", "route", "status"), self.requests)
+            render_counter(lines, "http_request_errors_total", "HTTP requests answered with a 5xx status",
+                           ("method", "route"), self.request_errors)
+            render_histogram(lines, "http_request_duration_seconds", "HTTP request latency",
+                             ("method", "route"), self.request_latency)
+            render_counter(lines, "mongodb_commands_total", "MongoDB commands by collection and command",
+                           ("collection", "command"), self.commands)
+            render_counter(lines, "mongodb_command_failures_total", "MongoDB commands that failed",
+                           ("collection", "command"), self.command_failures)
+            render_histogram(lines, "mongodb_command_duration_seconds", "MongoDB command latency",
+                             ("collection", "command"), self.command_latency)
+        for name, (help_text, value) in (gauges or {}).items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value: str):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names, values, extra=()):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}"
+
+
+def render_counter(lines, name, help_text, label_names, values):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for labels, value in sorted(values.items()):
+        lines.append(f"{name}{format_labels(label_names, labels)} {value}")
+
+
+def render_histogram(lines, name, help_text, label_names, histograms):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels(label_names, labels, [('le', str(bound))])} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(label_names, labels)} {histogram.total}")
+        lines.append(f"{name}_count{format_labels(label_names, labels)} {histogram.count}")
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request under its route template
+
+    Labelling by template (e.g. /api/reports/{report_id}) rather than raw
+    path keeps the number of series bounded. Requests to untimed_routes, such
+    as event streams held open for minutes, are counted but kept out of the
+    latency histogram.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry, untimed_routes=()):
+        self.app = app
+        self.registry = registry
+        self.untimed_routes = frozenset(untimed_routes)
+        self.route_paths = None
+
+    def route_label(self, scope):
+        if self.route_paths is None:
+            self.route_paths = {
+                route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        return self.route_paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = self.route_label(scope)
+            seconds = None if route in self.untimed_routes else time.perf_counter() - started
+            self.registry.observe_request(scope["method"], route, status, seconds)
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Time every MongoDB command by collection and command name"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.in_flight = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        self.in_flight[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ""
+
+    def succeeded(self, event):
+        self.finish(event, failed=False)
+
+    def failed(self, event):
+        self.finish(event, failed=True)
+
+    def finish(self, event, failed: bool):
+        collection = self.in_flight.pop((event.connection_id, event.request_id), "")
+        self.registry.observe_command(collection, event.command_name, event.duration_micros / 1e6, failed)
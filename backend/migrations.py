@@ -0,0 +1,111 @@
+"""Online data migrations for the reports collections
+
+migrate_report_dates is a required deploy step for databases written before
+timestamps were stored as BSON dates: MongoDB only compares values of the
+same type, so a string created_at/updated_at never matches a date range, a
+pagination cursor, the changes feed or the archiver. The API logs an error at
+startup while any are left (see has_legacy_dates).
+"""
+import logging
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from dedup import report_signature
+
+
+logger = logging.getLogger(__name__)
+
+DATE_FIELDS = ("created_at", "updated_at")
+
+
+def parse_legacy_date(value: str):
+    """Parse an ISO string written by the old prepare_for_mongo as a UTC datetime"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+async def has_legacy_dates(db):
+    """Whether any report still holds a string date, i.e. migrate-dates has not finished"""
+    for field in DATE_FIELDS:
+        if await db.bullying_reports.find_one({field: {"$type": "string"}}, {"_id": 1}):
+            return True
+    return False
+
+
+async def migrate_report_dates(db, batch_size: int = 1000):
+    """Convert ISO string created_at/updated_at values to native BSON dates
+
+    Works in _id order, one bulk_write per batch, and only touches documents
+    that still hold a string, so it can run while the API is serving traffic
+    and be interrupted and re-run at any point. Each update is guarded on the
+    old value, so a concurrent status change is never overwritten.
+    Returns (converted, skipped) where skipped counts unparseable values.
+    """
+    pending = {"$or": [{field: {"$type": "string"}} for field in DATE_FIELDS]}
+    projection = {field: 1 for field in DATE_FIELDS}
+    converted = skipped = 0
+    last_id = None
+
+    while True:
+        query = pending if last_id is None else {"$and": [pending, {"_id": {"$gt": last_id}}]}
+        batch = await db.bullying_reports.find(query, projection).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        operations = []
+        for document in batch:
+            guard = {"_id": document["_id"]}
+            changes = {}
+            for field in DATE_FIELDS:
+                value = document.get(field)
+                if not isinstance(value, str):
+                    continue
+                try:
+                    changes[field] = parse_legacy_date(value)
+                    guard[field] = value
+                except ValueError:
+                    skipped += 1
+                    logger.warning(f"Skipping unparseable {field} on {document['_id']}: {value!r}")
+            if changes:
+                operations.append(UpdateOne(guard, {"$set": changes}))
+
+        if operations:
+            result = await db.bullying_reports.bulk_write(operations, ordered=False)
+            converted += result.modified_count
+        logger.info(f"Migrated {converted} report dates so far (last _id {last_id})")
+
+    return converted, skipped
+
+
+async def backfill_report_signatures(db, batch_size: int = 1000):
+    """Store MinHash signatures on reports created before duplicate detection
+
+    Same resumable _id-ordered batching as migrate_report_dates; only reports
+    without lsh_bands are read, so re-running picks up where it stopped.
+    Returns the number of reports updated.
+    """
+    pending = {"lsh_bands": {"$exists": False}}
+    projection = {"description": 1, "class_name": 1, "date_occurred": 1}
+    updated = 0
+    last_id = None
+
+    while True:
+        query = pending if last_id is None else {"$and": [pending, {"_id": {"$gt": last_id}}]}
+        batch = await db.bullying_reports.find(query, projection).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        operations = [
+            UpdateOne({"_id": document["_id"], **pending}, {"$set": report_signature(document)})
+            for document in batch
+        ]
+        result = await db.bullying_reports.bulk_write(operations, ordered=False)
+        updated += result.modified_count
+        logger.info(f"Stored {updated} report signatures so far (last _id {last_id})")
+
+    return updated
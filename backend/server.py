@@ -1,27 +1,152 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
+from urllib.parse import quote
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Optional
 import uuid
-from datetime import datetime, timezone
+import base64
+import csv
+import hashlib
+import io
+import json
+import time
+import asyncio
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 
+from admission import ConcurrencyLimiter, TokenBucketLimiter
+from analytics import ANALYTICS_FIELDS, build_analytics
+from attachments import (
+    ATTACHMENTS_BUCKET, AttachmentRejected, MultipartFileReader, attachment_description, parse_range, read_range,
+    store_attachment,
+)
+from archive import archive_periodically, restore_archived_reports
+from database import Database
+from dedup import report_signature, similarity
+from events import ReportEventBroker, format_sse, watch_report_changes
+from indexes import ensure_indexes, ensure_ttl_index
+from metrics import CommandMetrics, MetricsMiddleware, MetricsRegistry
+from migrations import has_legacy_dates
+from write_behind import WriteBehindBuffer
+
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, opened and closed by the app lifespan. Pool size,
+# timeouts and compression come from the MONGO_* variables (see database.py)
+mongo = Database()
+metrics = MetricsRegistry()
 
-# Create the main app without a prefix
-app = FastAPI()
+# Seconds the readiness probe waits for a ping before reporting not ready
+READINESS_TIMEOUT = float(os.environ.get('READINESS_TIMEOUT', 2))
+
+# Report listing pagination
+REPORTS_PAGE_SIZE = int(os.environ.get('REPORTS_PAGE_SIZE', 100))
+REPORTS_MAX_PAGE_SIZE = int(os.environ.get('REPORTS_MAX_PAGE_SIZE', 1000))
+REPORTS_SORT = [("created_at", -1), ("id", -1)]
+
+# Text search pagination; relevance order cannot be keyset-paginated, so depth is capped
+SEARCH_PAGE_SIZE = int(os.environ.get('SEARCH_PAGE_SIZE', 20))
+SEARCH_MAX_OFFSET = int(os.environ.get('SEARCH_MAX_OFFSET', 1000))
+
+# Delta sync: page size, and how long a write must have settled before it is
+# handed out, so a slow in-flight write cannot land behind a watermark
+CHANGES_PAGE_SIZE = int(os.environ.get('CHANGES_PAGE_SIZE', 500))
+CHANGES_SETTLE_SECONDS = float(os.environ.get('CHANGES_SETTLE_SECONDS', 1))
+
+# Heartbeats are buffered and inserted in batches, and expire after a retention period
+HEARTBEAT_FLUSH_SIZE = int(os.environ.get('HEARTBEAT_FLUSH_SIZE', 200))
+HEARTBEAT_FLUSH_INTERVAL = float(os.environ.get('HEARTBEAT_FLUSH_INTERVAL', 1))
+HEARTBEAT_MAX_PENDING = int(os.environ.get('HEARTBEAT_MAX_PENDING', 10000))
+STATUS_CHECK_TTL_SECONDS = int(os.environ.get('STATUS_CHECK_TTL_SECONDS', 7 * 24 * 3600))
+STATUS_CHECK_PAGE_SIZE = int(os.environ.get('STATUS_CHECK_PAGE_SIZE', 100))
+
+# Characters of the description shipped by the compact list view
+DESCRIPTION_PREVIEW_LENGTH = int(os.environ.get('DESCRIPTION_PREVIEW_LENGTH', 200))
+
+# Server-Sent Events: per-subscriber queue bound, keep-alive interval, and
+# whether to try a change stream ("auto") or only publish locally ("local")
+EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', 100))
+EVENTS_HEARTBEAT = float(os.environ.get('EVENTS_HEARTBEAT', 15))
+EVENTS_SOURCE = os.environ.get('EVENTS_SOURCE', 'auto')
+SUMMARY_EVENT_DELAY = float(os.environ.get('SUMMARY_EVENT_DELAY', 1))
+
+# Documents fetched per round trip when streaming an export
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+
+# Public submissions: per-client token bucket (sustained rate and burst) and a
+# global cap on concurrent report writes. Bulk imports draw from their own
+# bucket, charged per item.
+REPORT_RATE_PER_MINUTE = float(os.environ.get('REPORT_RATE_PER_MINUTE', 6))
+REPORT_RATE_BURST = int(os.environ.get('REPORT_RATE_BURST', 20))
+REPORT_MAX_CONCURRENT_WRITES = int(os.environ.get('REPORT_MAX_CONCURRENT_WRITES', 32))
+BULK_ITEMS_PER_MINUTE = float(os.environ.get('BULK_ITEMS_PER_MINUTE', 1000))
+BULK_ITEMS_BURST = int(os.environ.get('BULK_ITEMS_BURST', 2000))
+# Proxies in front of the app that append to X-Forwarded-For; clients are
+# keyed on the address the outermost of them saw. 0 keys on the socket peer.
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 0))
+
+# Evidence attachments: size and type limits, how many a report may carry,
+# and how many uploads may stream into GridFS at once
+ATTACHMENT_MAX_BYTES = int(os.environ.get('ATTACHMENT_MAX_BYTES', 10 * 1024 * 1024))
+ATTACHMENT_ALLOWED_TYPES = set(os.environ.get(
+    'ATTACHMENT_ALLOWED_TYPES', 'image/png,image/jpeg,image/gif,image/webp,application/pdf'
+).split(','))
+ATTACHMENTS_PER_REPORT = int(os.environ.get('ATTACHMENTS_PER_REPORT', 5))
+ATTACHMENT_MAX_CONCURRENT_UPLOADS = int(os.environ.get('ATTACHMENT_MAX_CONCURRENT_UPLOADS', 4))
+ATTACHMENT_READ_CHUNK = 255 * 1024
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Bulk ingestion limits: items per request, body size, and the longest NDJSON
+# line buffered (a longer one is skipped and reported as a failed item)
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 10000))
+BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 1000))
+BULK_MAX_BYTES = int(os.environ.get('BULK_MAX_BYTES', 32 * 1024 * 1024))
+BULK_MAX_LINE_BYTES = int(os.environ.get('BULK_MAX_LINE_BYTES', 64 * 1024))
+
+# Largest number of status changes accepted in one batch
+STATUS_BATCH_MAX_ITEMS = int(os.environ.get('STATUS_BATCH_MAX_ITEMS', 500))
+
+# Near-duplicate detection: estimated Jaccard similarity at which a report is
+# flagged as a likely copy, and how many LSH candidates are scored per lookup
+DUPLICATE_SIMILARITY = float(os.environ.get('DUPLICATE_SIMILARITY', 0.6))
+DUPLICATE_CANDIDATE_LIMIT = int(os.environ.get('DUPLICATE_CANDIDATE_LIMIT', 50))
+SIMILAR_REPORTS_LIMIT = int(os.environ.get('SIMILAR_REPORTS_LIMIT', 10))
+
+# Hot/cold tiering: reports resolved and untouched for ARCHIVE_AFTER_DAYS are
+# moved to bullying_reports_archive every ARCHIVE_INTERVAL seconds (0 disables)
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))
+ARCHIVE_INTERVAL = float(os.environ.get('ARCHIVE_INTERVAL', 3600))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+
+# Analytics: worker processes running the pandas step, documents fetched per
+# round trip, and how long and how many results are cached (all are also
+# dropped on every write)
+ANALYTICS_WORKERS = int(os.environ.get('ANALYTICS_WORKERS', 1))
+ANALYTICS_BATCH_SIZE = int(os.environ.get('ANALYTICS_BATCH_SIZE', 5000))
+ANALYTICS_CACHE_TTL = float(os.environ.get('ANALYTICS_CACHE_TTL', 3600))
+ANALYTICS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYTICS_CACHE_MAX_ENTRIES', 64))
+
+# Largest number of ids resolved by one batch-get request
+BATCH_GET_MAX_IDS = int(os.environ.get('BATCH_GET_MAX_IDS', 500))
+
+# Seconds a computed summary is served before it is recomputed, even without writes
+SUMMARY_CACHE_TTL = float(os.environ.get('SUMMARY_CACHE_TTL', 30))
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -44,6 +169,16 @@ class ReportStatus(str, Enum):
     RESOLVED = "resolved"
 
 
+class ReportView(str, Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
 # Models
 class BullyingReport(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -56,6 +191,7 @@ class BullyingReport(BaseModel):
     description: str
     is_anonymous: bool = False
     status: ReportStatus = ReportStatus.PENDING
+    possible_duplicates: List[str] = Field(default_factory=list)  # Ids of likely earlier copies
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -75,6 +211,65 @@ class BullyingReportUpdate(BaseModel):
     status: ReportStatus
 
 
+class ReportStatusChange(BaseModel):
+    id: str
+    status: ReportStatus
+
+
+class ReportStatusBatchResult(BaseModel):
+    matched: int
+    modified: int
+    not_found: List[str]
+
+
+class ReportBatchGetRequest(BaseModel):
+    ids: List[str]
+
+
+class ReportBatchGetItem(BaseModel):
+    id: str
+    found: bool
+    report: Optional[BullyingReport] = None
+
+
+class ReportBatchGetResult(BaseModel):
+    results: List[ReportBatchGetItem]
+    not_found: List[str]
+
+
+class ReportChanges(BaseModel):
+    reports: List[BullyingReport]
+    archived: List[str] = []  # ids moved to the archive: drop them from a local copy
+    watermark: Optional[str] = None
+    has_more: bool
+
+
+class BulkReportItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    errors: Optional[List[dict]] = None
+
+
+class BulkReportResult(BaseModel):
+    inserted: int
+    failed: int
+    results: List[BulkReportItemResult]
+    truncated: bool = False  # items past BULK_MAX_ITEMS or the client's bulk rate were not read
+
+
+class SimilarReport(BullyingReport):
+    similarity: float
+
+
+class Attachment(BaseModel):
+    id: str
+    report_id: str
+    filename: str
+    content_type: str
+    size: int
+    uploaded_at: datetime
+
+
 class StatusCheck(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     client_name: str
@@ -85,17 +280,33 @@ class StatusCheckCreate(BaseModel):
     client_name: str
 
 
+# Fields returned to clients; anything else stored on a report stays internal
+REPORT_FIELDS = list(BullyingReport.model_fields)
+REPORT_PROJECTION = {**{field: 1 for field in REPORT_FIELDS}, "_id": 0}
+
+
+def as_utc(value: datetime):
+    """Treat naive datetimes as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
 def prepare_for_mongo(data):
-    """Convert datetime objects to ISO strings for MongoDB storage"""
+    """Normalize datetimes to UTC; MongoDB stores them as native BSON dates"""
     if isinstance(data.get('created_at'), datetime):
-        data['created_at'] = data['created_at'].isoformat()
+        data['created_at'] = as_utc(data['created_at'])
     if isinstance(data.get('updated_at'), datetime):
-        data['updated_at'] = data['updated_at'].isoformat()
+        data['updated_at'] = as_utc(data['updated_at'])
     return data
 
 
 def parse_from_mongo(item):
-    """Convert ISO strings back to datetime objects from MongoDB"""
+    """Convert ISO strings left by documents not yet migrated to BSON dates
+
+    Only reads are covered: queries comparing dates never match those
+    documents until manage.py migrate-dates has run.
+    """
     if isinstance(item.get('created_at'), str):
         item['created_at'] = datetime.fromisoformat(item['created_at'])
     if isinstance(item.get('updated_at'), str):
@@ -103,66 +314,988 @@ def parse_from_mongo(item):
     return item
 
 
+def encode_position(timestamp: datetime, report_id: str):
+    """Pack a (timestamp, id) keyset position into an opaque URL-safe token"""
+    payload = json.dumps({"c": timestamp.isoformat(), "i": report_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_position(token: str):
+    """Unpack a token from encode_position; raises ValueError if it is malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload['c']), payload['i']
+    except (KeyError, TypeError) as e:
+        raise ValueError(str(e))
+
+
+def encode_cursor(report):
+    """Build an opaque pagination token from the last report of a page"""
+    return encode_position(report['created_at'], report['id'])
+
+
+def decode_cursor(cursor: str):
+    """Decode a pagination token back into its (created_at, id) position"""
+    try:
+        return decode_position(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def decode_watermark(since: str):
+    """Accept either a watermark returned by /reports/changes or an ISO timestamp"""
+    try:
+        return as_utc(datetime.fromisoformat(since)), ""
+    except ValueError:
+        pass
+    try:
+        return decode_position(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid watermark")
+
+
+def report_filters(
+    status: Optional[ReportStatus] = None,
+    bullying_type: Optional[BullyingType] = None,
+    class_name: Optional[str] = None,
+    is_anonymous: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """Build the Mongo filter shared by the report listing routes"""
+    query = {}
+    if status is not None:
+        query['status'] = status.value
+    if bullying_type is not None:
+        query['bullying_type'] = bullying_type.value
+    if class_name is not None:
+        query['class_name'] = class_name
+    if is_anonymous is not None:
+        query['is_anonymous'] = is_anonymous
+    created_range = {}
+    if created_from is not None:
+        created_range['$gte'] = as_utc(created_from)
+    if created_to is not None:
+        created_range['$lt'] = as_utc(created_to)
+    if created_range:
+        query['created_at'] = created_range
+    return query
+
+
+def report_collections(include_archived: bool = False):
+    """The report collections a query reads: the hot one, plus the archive on request"""
+    if include_archived:
+        return [mongo.db.bullying_reports, mongo.db.bullying_reports_archive]
+    return [mongo.db.bullying_reports]
+
+
+def after_cursor(query, cursor: Optional[str]):
+    """Restrict a filter to the reports that sort after the given cursor"""
+    if not cursor:
+        return query
+    created_at, report_id = decode_cursor(cursor)
+    keyset = {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": report_id}},
+    ]}
+    if not query:
+        return keyset
+    return {"$and": [query, keyset]}
+
+
+class TTLCache:
+    """In-process LRU cache whose entries expire after a TTL or when cleared by a write
+
+    At most max_entries are kept, least recently used first out, and expired
+    entries are dropped whenever a new one is stored, so keys that are never
+    asked for again do not pile up between writes.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 128):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.generation = 0
+        # key -> [lock, callers using it]; a key's lock lives while it has callers
+        self.locks = {}
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key, value):
+        now = time.monotonic()
+        for stale in [k for k, (expires, _) in self.entries.items() if expires < now]:
+            del self.entries[stale]
+        self.entries[key] = (now + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.generation += 1
+
+    async def get_or_compute(self, key, compute):
+        """Return the cached value, computing it at most once for concurrent callers
+
+        Callers only wait on others asking for the same key; different keys
+        are computed in parallel.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        lock = self.locks.setdefault(key, [asyncio.Lock(), 0])
+        lock[1] += 1
+        try:
+            async with lock[0]:
+                value = self.get(key)
+                if value is None:
+                    generation = self.generation
+                    value = await compute()
+                    # A write that landed mid-computation may not be reflected in value
+                    if generation == self.generation:
+                        self.set(key, value)
+                return value
+        finally:
+            lock[1] -= 1
+            if not lock[1]:
+                del self.locks[key]
+
+
+# Keyed by version: room for the current and previous version, each with and
+# without the archive, so summaries of versions other workers have moved past
+# are evicted rather than kept until the next local write
+summary_cache = TTLCache(SUMMARY_CACHE_TTL, max_entries=4)
+analytics_cache = TTLCache(ANALYTICS_CACHE_TTL, ANALYTICS_CACHE_MAX_ENTRIES)
+report_rate_limiter = TokenBucketLimiter(REPORT_RATE_PER_MINUTE / 60, REPORT_RATE_BURST)
+bulk_item_rate_limiter = TokenBucketLimiter(BULK_ITEMS_PER_MINUTE / 60, BULK_ITEMS_BURST)
+report_write_slots = ConcurrencyLimiter(REPORT_MAX_CONCURRENT_WRITES)
+attachment_upload_slots = ConcurrencyLimiter(ATTACHMENT_MAX_CONCURRENT_UPLOADS)
+status_check_buffer = WriteBehindBuffer(HEARTBEAT_FLUSH_SIZE, HEARTBEAT_FLUSH_INTERVAL, HEARTBEAT_MAX_PENDING)
+report_events = ReportEventBroker(EVENTS_QUEUE_SIZE)
+background_tasks = set()
+# Created by the app lifespan; without it analytics run in the default thread pool
+analytics_pool = None
+
+
+def publish_report_event(event_type: str, data):
+    """Publish from a route handler unless the change stream already covers it"""
+    if report_events.source == "local":
+        report_events.publish(event_type, data)
+
+
+def schedule_summary_event():
+    """Push fresh summary counters to subscribers, coalescing bursts of writes"""
+    if not report_events.subscribers or any(task.get_name() == "summary_event" for task in background_tasks):
+        return
+
+    async def publish_summary():
+        await asyncio.sleep(SUMMARY_EVENT_DELAY)
+        try:
+            summary = await cached_reports_summary(await reports_version())
+            report_events.publish("summary", summary)
+        except Exception as e:
+            logging.error(f"Error publishing summary event: {e}")
+
+    task = asyncio.create_task(publish_summary(), name="summary_event")
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
+def reports_changed_elsewhere():
+    """Change stream hook: another worker (or this one) wrote a report"""
+    summary_cache.clear()
+    analytics_cache.clear()
+    schedule_summary_event()
+
+
+async def mark_reports_changed():
+    """Invalidate everything derived from bullying_reports after a write
+
+    Bumps the shared collection version that conditional GETs are tagged
+    with, so every worker sees the change. A failed bump is only logged:
+    the write itself already succeeded.
+    """
+    summary_cache.clear()
+    analytics_cache.clear()
+    if report_events.source == "local":
+        schedule_summary_event()
+    try:
+        await mongo.db.collection_versions.update_one(
+            {"_id": "bullying_reports"}, {"$inc": {"version": 1}}, upsert=True
+        )
+    except Exception as e:
+        logging.error(f"Error bumping reports version: {e}")
+
+
+async def reports_archived(report_ids):
+    """Archiver hook: the reports left the hot collection
+
+    Published straight to this worker's subscribers: the change stream only
+    carries inserts and updates. Clients of other workers pick the removal
+    up from /reports/changes.
+    """
+    await mark_reports_changed()
+    report_events.publish("reports_archived", {"ids": report_ids})
+
+
+async def reports_version():
+    version = await mongo.db.collection_versions.find_one({"_id": "bullying_reports"})
+    return version["version"] if version else 0
+
+
+def make_etag(version: int, request: Request):
+    """Strong ETag for a response derived from the given collection version"""
+    digest = hashlib.sha1(f"{request.url.path}?{request.url.query}".encode()).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def etag_matches(request: Request, etag: str):
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip().removeprefix('W/') for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+async def conditional_etag(request: Request):
+    """Dependency: tag the response with the current version, or answer 304
+
+    The version is read before the documents, so a response can only ever be
+    tagged older than its content, never newer. Routes serving cached content
+    must key it by this version (request.state.reports_version) or the ETag,
+    or a cache filled before another worker's write would be tagged newer.
+    """
+    version = await reports_version()
+    request.state.reports_version = version
+    etag = make_etag(version, request)
+    if etag_matches(request, etag):
+        raise NotModified(etag)
+    return etag
+
+
+def etag_headers(etag: str):
+    # no-cache makes browsers revalidate with If-None-Match instead of guessing
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+# Single-pass summary: every counter is a branch of one $facet stage
+SUMMARY_PIPELINE = [
+    {"$facet": {
+        "total": [{"$count": "count"}],
+        "anonymous": [{"$match": {"is_anonymous": True}}, {"$count": "count"}],
+        "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+        "by_bullying_type": [{"$group": {"_id": "$bullying_type", "count": {"$sum": 1}}}],
+        "by_class_name": [{"$group": {"_id": "$class_name", "count": {"$sum": 1}}}],
+        "by_location": [{"$group": {"_id": "$location", "count": {"$sum": 1}}}],
+    }}
+]
+
+
+def facet_count(rows):
+    return sum(row["count"] for row in rows)
+
+
+def facet_breakdown(rows):
+    counts = {}
+    for row in rows:
+        counts[row["_id"]] = counts.get(row["_id"], 0) + row["count"]
+    return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+
+async def compute_reports_summary(collections):
+    """Run the summary aggregation on each collection and shape the combined counts"""
+    results = await asyncio.gather(*(collection.aggregate(SUMMARY_PIPELINE).to_list(1) for collection in collections))
+    facets = {name: [row for result in results for row in result[0][name]] for name in results[0][0]}
+    by_status = facet_breakdown(facets["by_status"])
+    return {
+        "total_reports": facet_count(facets["total"]),
+        "pending_reports": by_status.get(ReportStatus.PENDING.value, 0),
+        "in_progress_reports": by_status.get(ReportStatus.IN_PROGRESS.value, 0),
+        "resolved_reports": by_status.get(ReportStatus.RESOLVED.value, 0),
+        "anonymous_reports": facet_count(facets["anonymous"]),
+        "by_bullying_type": facet_breakdown(facets["by_bullying_type"]),
+        "by_class_name": facet_breakdown(facets["by_class_name"]),
+        "by_location": facet_breakdown(facets["by_location"]),
+    }
+
+
+async def cached_reports_summary(version: int, include_archived: bool = False):
+    """Summary for the given reports version; read the version before calling"""
+    return await summary_cache.get_or_compute(
+        f"summary:{version}:{include_archived}", lambda: compute_reports_summary(report_collections(include_archived))
+    )
+
+
+async def compute_reports_analytics(query, collections):
+    """Pull the analytics columns with a batched cursor and hand them to a worker process
+
+    Only plain column lists cross the process boundary; the pandas work never
+    runs on the event loop.
+    """
+    columns = {field: [] for field in ANALYTICS_FIELDS}
+    projection = {**{field: 1 for field in ANALYTICS_FIELDS}, "_id": 0}
+    for collection in collections:
+        async for report in collection.find(query, projection).batch_size(ANALYTICS_BATCH_SIZE):
+            report = parse_from_mongo(report)
+            columns["created_at"].append(as_utc(report["created_at"]).timestamp())
+            columns["bullying_type"].append(report["bullying_type"])
+            columns["class_name"].append(report["class_name"])
+            columns["age"].append(report["age"])
+    return await asyncio.get_running_loop().run_in_executor(analytics_pool, build_analytics, columns)
+
+
+def json_default(value):
+    """Encode the non-JSON types found in report documents"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Leading characters that make spreadsheet apps evaluate a cell as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def csv_value(value):
+    """Flatten a report value into a CSV cell
+
+    Text comes from the public form, so a value that a spreadsheet would run
+    as a formula is prefixed with a quote to keep it plain text.
+    """
+    if isinstance(value, datetime):
+        return json_default(value)
+    if isinstance(value, list):
+        value = " ".join(value)
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class TrustedJSONResponse(JSONResponse):
+    """Encode documents read from our own collections straight to JSON bytes
+
+    Skips building and re-validating pydantic models for data that was already
+    validated on the way in; the database projection decides the shape.
+    """
+
+    def render(self, content) -> bytes:
+        return json.dumps(content, default=json_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def report_projection(view: ReportView = ReportView.FULL, fields: Optional[str] = None):
+    """Build the Mongo projection for the requested view or sparse fieldset
+
+    id and created_at are always returned so pages can be continued.
+    """
+    if fields:
+        requested = {field.strip() for field in fields.split(',') if field.strip()}
+        unknown = requested - set(REPORT_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        return {**{field: 1 for field in requested | {'id', 'created_at'}}, "_id": 0}
+    if view == ReportView.SUMMARY:
+        projection = {field: 1 for field in REPORT_FIELDS if field != 'description'}
+        projection['description_preview'] = {"$substrCP": ["$description", 0, DESCRIPTION_PREVIEW_LENGTH]}
+        projection['_id'] = 0
+        return projection
+    return REPORT_PROJECTION
+
+
+async def export_report_chunks(query, format: ExportFormat, collections):
+    """Stream the matching reports one cursor batch at a time, collection by collection"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=REPORT_FIELDS, extrasaction='ignore')
+    if format == ExportFormat.CSV:
+        writer.writeheader()
+
+    rows = 0
+    try:
+        for collection in collections:
+            cursor = collection.find(query, REPORT_PROJECTION).sort(REPORTS_SORT).batch_size(EXPORT_BATCH_SIZE)
+            async for report in cursor:
+                if format == ExportFormat.CSV:
+                    writer.writerow({key: csv_value(value) for key, value in report.items()})
+                else:
+                    buffer.write(json.dumps(report, default=json_default, ensure_ascii=False))
+                    buffer.write("\n")
+                rows += 1
+                if rows % EXPORT_BATCH_SIZE == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+        yield buffer.getvalue()
+    except Exception as e:
+        logging.error(f"Error exporting reports after {rows} rows: {e}")
+        raise
+
+
+async def iter_bulk_items(request: Request):
+    """Yield (item, error) pairs from a JSON array body or a streamed NDJSON body
+
+    Bodies declared larger than BULK_MAX_BYTES are refused with a 413 before
+    any byte is read. A JSON array has to be parsed whole, so its body is
+    also cut off at BULK_MAX_BYTES; NDJSON only ever buffers one line.
+    """
+    content_type = request.headers.get('content-type', '')
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > BULK_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Bulk bodies are limited to {BULK_MAX_BYTES} bytes")
+    if 'ndjson' not in content_type:
+        body = bytearray()
+        async for chunk in request.stream():
+            body += chunk
+            if len(body) > BULK_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"Bulk bodies are limited to {BULK_MAX_BYTES} bytes")
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if len(items) > BULK_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} reports per request")
+        for item in items:
+            yield item, None
+        return
+
+    line_too_long = [{"type": "line_too_long", "loc": [], "msg": f"Lines are limited to {BULK_MAX_LINE_BYTES} bytes"}]
+    pending = b""
+    # Set while discarding the rest of a line that outgrew BULK_MAX_LINE_BYTES
+    overlong = False
+    async for chunk in request.stream():
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            if overlong or len(line) > BULK_MAX_LINE_BYTES:
+                overlong = False
+                yield None, line_too_long
+            elif line.strip():
+                yield parse_ndjson_line(line)
+        if len(pending) > BULK_MAX_LINE_BYTES:
+            overlong, pending = True, b""
+    if overlong:
+        yield None, line_too_long
+    elif pending.strip():
+        yield parse_ndjson_line(pending)
+
+
+def parse_ndjson_line(line: bytes):
+    try:
+        return json.loads(line), None
+    except ValueError as e:
+        return None, [{"type": "json_invalid", "loc": [], "msg": str(e)}]
+
+
+async def insert_report_chunk(chunk, results):
+    """Insert prepared reports unordered and record the ones the database rejected"""
+    failed_positions = set()
+    try:
+        await mongo.db.bullying_reports.insert_many([report for _, report in chunk], ordered=False)
+    except BulkWriteError as e:
+        for write_error in e.details.get('writeErrors', []):
+            position = write_error['index']
+            failed_positions.add(position)
+            index = chunk[position][0]
+            results[index] = BulkReportItemResult(
+                index=index, errors=[{"type": "write_error", "loc": [], "msg": write_error.get('errmsg', '')}]
+            )
+    for position, (index, report) in enumerate(chunk):
+        if position not in failed_positions:
+            results[index] = BulkReportItemResult(index=index, id=report['id'])
+    return len(chunk) - len(failed_positions)
+
+
+async def find_report_page(query, projection, limit: int, include_archived: bool = False):
+    """Up to limit reports matching query in REPORTS_SORT order
+
+    With the archive included, both collections are read with the same
+    indexed query and the two sorted pages are merged, so keyset cursors
+    work unchanged across tiers.
+    """
+    pages = await asyncio.gather(*(
+        collection.find(query, projection).sort(REPORTS_SORT).limit(limit).to_list(limit)
+        for collection in report_collections(include_archived)
+    ))
+    reports = [parse_from_mongo(report) for page in pages for report in page]
+    if len(pages) > 1:
+        reports.sort(key=lambda report: (as_utc(report['created_at']), report['id']), reverse=True)
+    return reports[:limit]
+
+
+async def find_similar_reports(signature, exclude_id=None, projection=None, min_similarity=DUPLICATE_SIMILARITY):
+    """Reports sharing an LSH band with the signature, scored and best first
+
+    The multikey lsh_bands index turns the lookup into a handful of index seeks
+    instead of a scan over every stored report; only the candidates found
+    there are compared signature by signature.
+    """
+    query = {"lsh_bands": {"$in": signature["lsh_bands"]}}
+    if exclude_id:
+        query["id"] = {"$ne": exclude_id}
+    candidates = await mongo.db.bullying_reports.find(
+        query, {**(projection or {"id": 1, "_id": 0}), "minhash": 1}
+    ).limit(DUPLICATE_CANDIDATE_LIMIT).to_list(DUPLICATE_CANDIDATE_LIMIT)
+    scored = []
+    for candidate in candidates:
+        score = similarity(signature["minhash"], candidate.pop("minhash", None))
+        if score >= min_similarity:
+            scored.append((score, candidate))
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return scored
+
+
+def client_address(request: Request):
+    """Address a client is rate limited on
+
+    With TRUSTED_PROXY_HOPS set, it is read from X-Forwarded-For, counting
+    that many entries from the right: entries further left were written by
+    the client itself and could be forged.
+    """
+    if TRUSTED_PROXY_HOPS:
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        if forwarded:
+            return forwarded[-min(TRUSTED_PROXY_HOPS, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+
+def admit_client(request: Request, slots: ConcurrencyLimiter, limiter: TokenBucketLimiter = None):
+    """Take a write slot and charge the client's token bucket, or raise 503/429
+
+    The slot is checked first so that a 503 costs the client no token: a
+    legitimate user retrying while the server is busy is not pushed into 429.
+    """
+    if not slots.try_acquire():
+        raise HTTPException(
+            status_code=503, detail="Server busy, please try again shortly",
+            headers={"Retry-After": "1"}
+        )
+    allowed, retry_after = (limiter or report_rate_limiter).acquire(client_address(request))
+    if not allowed:
+        slots.release()
+        raise HTTPException(
+            status_code=429, detail="Too many reports, please try again later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+async def admit_report_submission(request: Request):
+    """Dependency: reject floods fast before they reach the database
+
+    429 when this client is over its rate, 503 when too many report writes
+    are already in flight; both carry Retry-After.
+    """
+    admit_client(request, report_write_slots)
+    try:
+        yield
+    finally:
+        report_write_slots.release()
+
+
+async def admit_bulk_submission(request: Request):
+    """Dependency: like admit_report_submission, against the per-item bulk bucket
+
+    Admission pays for the first item; create_reports_bulk charges the rest
+    as they are read.
+    """
+    admit_client(request, report_write_slots, bulk_item_rate_limiter)
+    try:
+        yield
+    finally:
+        report_write_slots.release()
+
+
+async def admit_attachment_upload(request: Request):
+    """Dependency: like admit_report_submission, with its own cap on uploads in flight
+
+    Oversized bodies are refused from Content-Length before any byte is read;
+    bodies sent without one are cut off by MultipartFileReader as they stream.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > ATTACHMENT_MAX_BYTES + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"Attachments are limited to {ATTACHMENT_MAX_BYTES} bytes")
+    admit_client(request, attachment_upload_slots)
+    try:
+        yield
+    finally:
+        attachment_upload_slots.release()
+
+
+def attachments_bucket():
+    return AsyncIOMotorGridFSBucket(mongo.db, bucket_name=ATTACHMENTS_BUCKET)
+
+
+async def report_exists(report_id: str):
+    """Whether the report is stored, hot or archived"""
+    for collection in report_collections(include_archived=True):
+        if await collection.find_one({"id": report_id}, {"_id": 1}):
+            return True
+    return False
+
+
 # Basic routes
 @api_router.get("/")
 async def root():
     return {"message": "Cicero Sem Bullying API"}
 
 
+@api_router.get("/health/live")
+async def health_live():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@api_router.get("/health/ready")
+async def health_ready():
+    """Readiness probe: MongoDB answers a ping within READINESS_TIMEOUT"""
+    pool = mongo.pool_stats.snapshot()
+    pool["max_pool_size"] = mongo.settings.max_pool_size if mongo.settings else None
+    try:
+        ping_ms = await asyncio.wait_for(mongo.ping(), READINESS_TIMEOUT)
+    except Exception as e:
+        logging.error(f"Readiness check failed: {e}")
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "mongo": {"error": type(e).__name__}, "pool": pool},
+        )
+    return {"status": "ready", "mongo": {"ping_ms": round(ping_ms, 2)}, "pool": pool}
+
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Request, MongoDB command and connection pool metrics in Prometheus text format"""
+    pool = mongo.pool_stats.snapshot()
+    gauges = {
+        "mongodb_pool_open_connections": ("Open connections in the MongoDB pool", pool["open_connections"]),
+        "mongodb_pool_checked_out": ("MongoDB connections currently checked out", pool["checked_out"]),
+        "report_events_subscribers": ("Connected Server-Sent Events subscribers", len(report_events.subscribers)),
+        "status_check_buffer_pending": ("Heartbeats waiting for the next flush", len(status_check_buffer.pending)),
+    }
+    return PlainTextResponse(metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
+    """Record a heartbeat; it is written in the next batched flush"""
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
     status_data = prepare_for_mongo(status_obj.dict())
-    _ = await db.status_checks.insert_one(status_data)
+    status_check_buffer.add(status_data)
     return status_obj
 
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    parsed_checks = [parse_from_mongo(check) for check in status_checks]
-    return [StatusCheck(**status_check) for status_check in parsed_checks]
+async def get_status_checks(
+    cursor: Optional[str] = None,
+    limit: int = Query(STATUS_CHECK_PAGE_SIZE, ge=1, le=REPORTS_MAX_PAGE_SIZE),
+):
+    """Get a page of heartbeats, newest first; the next page token is in X-Next-Cursor"""
+    query = {}
+    if cursor:
+        timestamp, check_id = decode_cursor(cursor)
+        query = {"$or": [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "id": {"$lt": check_id}},
+        ]}
+    status_checks = await mongo.db.status_checks.find(query, {"_id": 0}).sort(
+        [("timestamp", -1), ("id", -1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    headers = {}
+    if len(status_checks) > limit:
+        last = status_checks[limit - 1]
+        headers["X-Next-Cursor"] = encode_position(last['timestamp'], last['id'])
+    return TrustedJSONResponse(status_checks[:limit], headers=headers)
 
 
 # Bullying report routes
-@api_router.post("/reports", response_model=BullyingReport)
+@api_router.post("/reports", response_model=BullyingReport, dependencies=[Depends(admit_report_submission)])
 async def create_report(input: BullyingReportCreate):
     """Create a new bullying report"""
     report_dict = input.dict()
     report_obj = BullyingReport(**report_dict)
-    report_data = prepare_for_mongo(report_obj.dict())
+    signature = report_signature(report_dict)
     
     try:
-        result = await db.bullying_reports.insert_one(report_data)
+        duplicates = await find_similar_reports(signature)
+        report_obj.possible_duplicates = [candidate['id'] for _, candidate in duplicates[:SIMILAR_REPORTS_LIMIT]]
+        report_data = {**prepare_for_mongo(report_obj.dict()), **signature}
+        result = await mongo.db.bullying_reports.insert_one(report_data)
+        await mark_reports_changed()
+        publish_report_event("report_created", report_obj.dict())
         return report_obj
     except Exception as e:
         logging.error(f"Error creating report: {e}")
         raise HTTPException(status_code=500, detail="Failed to create report")
 
 
+@api_router.post("/reports/bulk", response_model=BulkReportResult, dependencies=[Depends(admit_bulk_submission)])
+async def create_reports_bulk(request: Request, response: Response):
+    """Create many bullying reports from a JSON array or NDJSON body
+
+    Every item is validated independently; valid ones are written in unordered
+    insert_many batches and each item gets either its new id or its errors.
+    NDJSON bodies are consumed as they stream in: reading stops after
+    BULK_MAX_ITEMS lines, those are still written and reported item by item,
+    and the response is flagged truncated so the client can resend the rest.
+    Each item costs a token from the client's bulk bucket; once it runs dry
+    the body is cut short the same way, with Retry-After set.
+    """
+    results = {}
+    chunk = []
+    inserted = 0
+    index = -1
+    truncated = False
+    client = client_address(request)
+    try:
+        async for item, errors in iter_bulk_items(request):
+            if index + 1 >= BULK_MAX_ITEMS:
+                truncated = True
+                break
+            if index >= 0:
+                allowed, retry_after = bulk_item_rate_limiter.acquire(client)
+                if not allowed:
+                    truncated = True
+                    response.headers["Retry-After"] = str(retry_after)
+                    break
+            index += 1
+            if errors is None:
+                try:
+                    report_dict = BullyingReportCreate.model_validate(item).dict()
+                    report_obj = BullyingReport(**report_dict)
+                    chunk.append((index, {**prepare_for_mongo(report_obj.dict()), **report_signature(report_dict)}))
+                except ValidationError as e:
+                    errors = json.loads(e.json(include_url=False, include_input=False))
+            if errors is not None:
+                results[index] = BulkReportItemResult(index=index, errors=errors)
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                inserted += await insert_report_chunk(chunk, results)
+                chunk = []
+        if chunk:
+            inserted += await insert_report_chunk(chunk, results)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error creating reports in bulk: {e}")
+        raise HTTPException(status_code=500, detail="Failed to create reports")
+    finally:
+        if inserted:
+            await mark_reports_changed()
+            publish_report_event("reports_imported", {"count": inserted})
+
+    ordered_results = [results[i] for i in range(index + 1)]
+    return BulkReportResult(
+        inserted=inserted, failed=len(ordered_results) - inserted, results=ordered_results, truncated=truncated
+    )
+
+
 @api_router.get("/reports", response_model=List[BullyingReport])
-async def get_reports():
-    """Get all bullying reports (admin only)"""
+async def get_reports(
+    etag: str = Depends(conditional_etag),
+    filters: dict = Depends(report_filters),
+    projection: dict = Depends(report_projection),
+    cursor: Optional[str] = None,
+    limit: int = Query(REPORTS_PAGE_SIZE, ge=1, le=REPORTS_MAX_PAGE_SIZE),
+    include_archived: bool = False,
+):
+    """Get a page of bullying reports, newest first (admin only)
+
+    The token for the next page is returned in the X-Next-Cursor header.
+    view=summary replaces description with description_preview, and
+    fields=a,b,c returns only the listed fields. include_archived=true
+    also lists reports the archiver has moved out of the hot collection.
+    """
+    query = after_cursor(filters, cursor)
     try:
-        reports = await db.bullying_reports.find().sort("created_at", -1).to_list(1000)
-        parsed_reports = [parse_from_mongo(report) for report in reports]
-        return [BullyingReport(**report) for report in parsed_reports]
+        reports = await find_report_page(query, projection, limit + 1, include_archived)
+        parsed_reports = reports[:limit]
+        headers = etag_headers(etag)
+        if len(reports) > limit:
+            headers["X-Next-Cursor"] = encode_cursor(parsed_reports[-1])
+        return TrustedJSONResponse(parsed_reports, headers=headers)
     except Exception as e:
         logging.error(f"Error fetching reports: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch reports")
 
 
+@api_router.get("/reports/export")
+async def export_reports(
+    filters: dict = Depends(report_filters),
+    format: ExportFormat = ExportFormat.NDJSON,
+    include_archived: bool = False,
+):
+    """Stream every matching report as NDJSON or CSV (admin only)
+
+    With include_archived=true the archived reports follow the hot ones.
+    """
+    media_type = "application/x-ndjson" if format == ExportFormat.NDJSON else "text/csv; charset=utf-8"
+    return StreamingResponse(
+        export_report_chunks(filters, format, report_collections(include_archived)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="reports.{format.value}"'},
+    )
+
+
+@api_router.get("/reports/events")
+async def stream_report_events(request: Request):
+    """Server-Sent Events feed of report_created, reports_imported,
+    status_changed, reports_archived and summary events (admin only)
+
+    A "resync" event means events were lost and the client should reload.
+    """
+    queue = report_events.subscribe()
+
+    async def event_stream():
+        try:
+            yield f"retry: {int(EVENTS_HEARTBEAT * 1000)}\n\n"
+            while True:
+                try:
+                    event_id, event_type, data = await asyncio.wait_for(queue.get(), EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event_id, event_type, data, default=json_default)
+                if event_type == "resync":
+                    break
+        finally:
+            report_events.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def changed_after(field: str, since: Optional[str]):
+    """Filter on (field, id) positions that have settled and lie past the since watermark"""
+    settled = {field: {"$lt": datetime.now(timezone.utc) - timedelta(seconds=CHANGES_SETTLE_SECONDS)}}
+    if not since:
+        return settled
+    timestamp, report_id = decode_watermark(since)
+    return {"$and": [settled, {"$or": [
+        {field: {"$gt": timestamp}},
+        {field: timestamp, "id": {"$gt": report_id}},
+    ]}]}
+
+
+@api_router.get("/reports/changes", response_model=ReportChanges)
+async def get_report_changes(
+    since: Optional[str] = None,
+    limit: int = Query(CHANGES_PAGE_SIZE, ge=1, le=REPORTS_MAX_PAGE_SIZE),
+):
+    """Get reports created or updated after a watermark, oldest change first
+
+    Pass the returned watermark as since on the next call; while has_more is
+    true, call again straight away. Without since, every report is returned.
+    Reports the archiver moved out of the hot collection are listed by id in
+    archived, ordered with the updates by the time they were moved.
+    Changes are only handed out once CHANGES_SETTLE_SECONDS old.
+    """
+    updated = changed_after("updated_at", since)
+    removed = changed_after("archived_at", since)
+    try:
+        reports, archived = await asyncio.gather(
+            mongo.db.bullying_reports.find(updated, REPORT_PROJECTION).sort(
+                [("updated_at", 1), ("id", 1)]
+            ).limit(limit + 1).to_list(limit + 1),
+            mongo.db.bullying_reports_archive.find(removed, {"_id": 0, "id": 1, "archived_at": 1}).sort(
+                [("archived_at", 1), ("id", 1)]
+            ).limit(limit + 1).to_list(limit + 1),
+        )
+        changes = [(as_utc(parse_from_mongo(report)['updated_at']), report['id'], report) for report in reports]
+        changes += [(as_utc(removal['archived_at']), removal['id'], None) for removal in archived]
+        changes.sort(key=lambda change: change[:2])
+        page = changes[:limit]
+        watermark = since
+        if page:
+            watermark = encode_position(*page[-1][:2])
+        return TrustedJSONResponse({
+            "reports": [report for _, _, report in page if report is not None],
+            "archived": [report_id for _, report_id, report in page if report is None],
+            "watermark": watermark,
+            "has_more": len(changes) > limit,
+        })
+    except Exception as e:
+        logging.error(f"Error fetching report changes: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch report changes")
+
+
+@api_router.get("/reports/search", response_model=List[BullyingReport])
+async def search_reports(
+    q: str = Query(..., min_length=1, max_length=200),
+    filters: dict = Depends(report_filters),
+    projection: dict = Depends(report_projection),
+    offset: int = Query(0, ge=0, le=SEARCH_MAX_OFFSET),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=100),
+):
+    """Full-text search over description, location and class name (admin only)
+
+    Results are ranked by relevance and carry their score. When more results
+    exist, the offset of the next page is returned in the X-Next-Offset header.
+    """
+    query = {**filters, "$text": {"$search": q}}
+    projection = {**projection, "score": {"$meta": "textScore"}}
+    sort = [("score", {"$meta": "textScore"})] + REPORTS_SORT
+    try:
+        reports = await mongo.db.bullying_reports.find(query, projection).sort(sort).skip(offset).limit(limit + 1).to_list(limit + 1)
+        headers = {}
+        if len(reports) > limit and offset + limit <= SEARCH_MAX_OFFSET:
+            headers["X-Next-Offset"] = str(offset + limit)
+        return TrustedJSONResponse([parse_from_mongo(report) for report in reports[:limit]], headers=headers)
+    except Exception as e:
+        logging.error(f"Error searching reports: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search reports")
+
+
+@api_router.get("/reports/analytics")
+async def get_reports_analytics(
+    request: Request,
+    etag: str = Depends(conditional_etag),
+    filters: dict = Depends(report_filters),
+    include_archived: bool = False,
+):
+    """Weekly counts by type, a class by type heatmap and the age distribution (admin only)
+
+    Results are cached per data version and parsed filter set until the next
+    write, so unrelated query parameters (cache busters) share an entry.
+    """
+    key = json.dumps(
+        [request.state.reports_version, include_archived, filters], sort_keys=True, default=json_default
+    )
+    try:
+        analytics = await analytics_cache.get_or_compute(
+            key, lambda: compute_reports_analytics(filters, report_collections(include_archived))
+        )
+        return TrustedJSONResponse(analytics, headers=etag_headers(etag))
+    except Exception as e:
+        logging.error(f"Error computing reports analytics: {e}")
+        raise HTTPException(status_code=500, detail="Failed to compute reports analytics")
+
+
 @api_router.get("/reports/{report_id}", response_model=BullyingReport)
-async def get_report(report_id: str):
-    """Get a specific bullying report"""
+async def get_report(report_id: str, etag: str = Depends(conditional_etag)):
+    """Get a specific bullying report, looking in the archive if it is not hot"""
     try:
-        report = await db.bullying_reports.find_one({"id": report_id})
+        report = await mongo.db.bullying_reports.find_one({"id": report_id}, REPORT_PROJECTION)
+        if not report:
+            report = await mongo.db.bullying_reports_archive.find_one({"id": report_id}, REPORT_PROJECTION)
         if not report:
             raise HTTPException(status_code=404, detail="Report not found")
         
-        parsed_report = parse_from_mongo(report)
-        return BullyingReport(**parsed_report)
+        return TrustedJSONResponse(parse_from_mongo(report), headers=etag_headers(etag))
     except HTTPException:
         raise
     except Exception as e:
@@ -170,27 +1303,164 @@ async def get_report(report_id: str):
         raise HTTPException(status_code=500, detail="Failed to fetch report")
 
 
+@api_router.get("/reports/{report_id}/similar", response_model=List[SimilarReport])
+async def get_similar_reports(
+    report_id: str,
+    min_similarity: float = Query(DUPLICATE_SIMILARITY, ge=0, le=1),
+    limit: int = Query(SIMILAR_REPORTS_LIMIT, ge=1, le=DUPLICATE_CANDIDATE_LIMIT),
+):
+    """Reports that look like copies of this one, most similar first
+
+    The report itself may be archived; only hot reports are candidates.
+    """
+    try:
+        report = None
+        for collection in report_collections(include_archived=True):
+            report = await collection.find_one(
+                {"id": report_id}, {"_id": 0, "description": 1, "class_name": 1, "date_occurred": 1,
+                                    "minhash": 1, "lsh_bands": 1}
+            )
+            if report:
+                break
+        if not report:
+            raise HTTPException(status_code=404, detail="Report not found")
+        # Reports stored before signatures existed get one computed on the fly
+        signature = report if report.get('lsh_bands') else report_signature(report)
+        scored = await find_similar_reports(signature, report_id, REPORT_PROJECTION, min_similarity)
+        similar = [{**parse_from_mongo(candidate), "similarity": round(score, 3)} for score, candidate in scored[:limit]]
+        return TrustedJSONResponse(similar)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error finding reports similar to {report_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to find similar reports")
+
+
+@api_router.post(
+    "/reports/{report_id}/attachments", response_model=Attachment, status_code=201,
+    dependencies=[Depends(admit_attachment_upload)],
+)
+async def upload_attachment(report_id: str, request: Request):
+    """Attach a screenshot or document to a report
+
+    Send multipart/form-data with the file in a "file" field. The body is
+    streamed into GridFS as it arrives; the type is taken from the file's
+    contents, not from its name.
+    """
+    files = mongo.db[f"{ATTACHMENTS_BUCKET}.files"]
+    too_many = f"A report can have at most {ATTACHMENTS_PER_REPORT} attachments"
+    try:
+        reader = MultipartFileReader(request, max_bytes=ATTACHMENT_MAX_BYTES + MULTIPART_OVERHEAD)
+        if not await report_exists(report_id):
+            raise HTTPException(status_code=404, detail="Report not found")
+        stored = await files.count_documents({"metadata.report_id": report_id})
+        if stored >= ATTACHMENTS_PER_REPORT:
+            raise HTTPException(status_code=409, detail=too_many)
+        bucket = attachments_bucket()
+        attachment = await store_attachment(bucket, reader, report_id, ATTACHMENT_MAX_BYTES, ATTACHMENT_ALLOWED_TYPES)
+        # Concurrent uploads can all pass the count above; keeping the first
+        # ATTACHMENTS_PER_REPORT in upload order settles the race the same way for each
+        kept = await files.find({"metadata.report_id": report_id}, {"_id": 1}).sort(
+            [("uploadDate", 1), ("_id", 1)]
+        ).to_list(ATTACHMENTS_PER_REPORT)
+        if attachment["id"] not in {file["_id"] for file in kept}:
+            await bucket.delete(attachment["id"])
+            raise HTTPException(status_code=409, detail=too_many)
+        return TrustedJSONResponse(attachment, status_code=201)
+    except AttachmentRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error uploading attachment to report {report_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to upload attachment")
+
+
+@api_router.get("/reports/{report_id}/attachments", response_model=List[Attachment])
+async def list_attachments(report_id: str):
+    """List a report's attachments, oldest first"""
+    try:
+        files = await mongo.db[f"{ATTACHMENTS_BUCKET}.files"].find(
+            {"metadata.report_id": report_id}
+        ).sort("uploadDate", 1).to_list(ATTACHMENTS_PER_REPORT)
+        return TrustedJSONResponse([attachment_description(file) for file in files])
+    except Exception as e:
+        logging.error(f"Error listing attachments of report {report_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to list attachments")
+
+
+@api_router.get("/reports/{report_id}/attachments/{attachment_id}")
+async def download_attachment(report_id: str, attachment_id: str, request: Request):
+    """Stream an attachment; a single "Range: bytes=..." request gets a 206 partial response"""
+    try:
+        grid_out = await attachments_bucket().open_download_stream(attachment_id)
+    except NoFile:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    except Exception as e:
+        logging.error(f"Error opening attachment {attachment_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch attachment")
+    if (grid_out.metadata or {}).get("report_id") != report_id:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+
+    size = grid_out.length
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except AttachmentRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Content-Range": f"bytes */{size}"})
+    start, end = byte_range or (0, size - 1)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(max(end - start + 1, 0)),
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(grid_out.filename or 'attachment')}",
+        "ETag": f'"{attachment_id}"',
+        "X-Content-Type-Options": "nosniff",
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        read_range(grid_out, start, end, ATTACHMENT_READ_CHUNK),
+        status_code=206 if byte_range else 200,
+        media_type=grid_out.metadata["content_type"],
+        headers=headers,
+    )
+
+
 @api_router.put("/reports/{report_id}/status", response_model=BullyingReport)
 async def update_report_status(report_id: str, update: BullyingReportUpdate):
-    """Update the status of a bullying report"""
+    """Update the status of a bullying report
+
+    An archived report is moved back to the hot collection with the new
+    status, and announced to subscribers as a new report.
+    """
     try:
         update_data = {
             "status": update.status,
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "updated_at": datetime.now(timezone.utc)
         }
         
-        result = await db.bullying_reports.update_one(
+        updated_report = await mongo.db.bullying_reports.find_one_and_update(
             {"id": report_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
+        restored = updated_report is None
+        if restored:
+            restored_reports = await restore_archived_reports(
+                mongo.db.bullying_reports, mongo.db.bullying_reports_archive, {report_id: update_data}
+            )
+            if not restored_reports:
+                raise HTTPException(status_code=404, detail="Report not found")
+            updated_report = restored_reports[0]
+        await mark_reports_changed()
         
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Report not found")
-        
-        # Fetch and return updated report
-        updated_report = await db.bullying_reports.find_one({"id": report_id})
-        parsed_report = parse_from_mongo(updated_report)
-        return BullyingReport(**parsed_report)
+        report = BullyingReport(**parse_from_mongo(updated_report))
+        if restored:
+            publish_report_event("report_created", report.dict())
+        else:
+            publish_report_event("status_changed", {
+                "id": report_id, "status": update.status, "updated_at": update_data["updated_at"]
+            })
+        return report
         
     except HTTPException:
         raise
@@ -199,46 +1469,191 @@ async def update_report_status(report_id: str, update: BullyingReportUpdate):
         raise HTTPException(status_code=500, detail="Failed to update report status")
 
 
+@api_router.patch("/reports/status", response_model=ReportStatusBatchResult)
+async def update_report_statuses(changes: List[ReportStatusChange]):
+    """Apply many status changes in a single bulk write
+
+    If the same id appears more than once, the last change for it wins.
+    Archived reports are moved back to the hot collection, as with a single
+    status change.
+    """
+    if len(changes) > STATUS_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {STATUS_BATCH_MAX_ITEMS} status changes per request")
+    if not changes:
+        return ReportStatusBatchResult(matched=0, modified=0, not_found=[])
+
+    statuses = {change.id: change.status for change in changes}
+    updated_at = datetime.now(timezone.utc)
+    try:
+        result = await mongo.db.bullying_reports.bulk_write(
+            [
+                UpdateOne({"id": report_id}, {"$set": {"status": status, "updated_at": updated_at}})
+                for report_id, status in statuses.items()
+            ],
+            ordered=False
+        )
+        missing = []
+        restored = []
+        if result.matched_count < len(statuses):
+            found = set(await mongo.db.bullying_reports.distinct("id", {"id": {"$in": list(statuses)}}))
+            missing = [report_id for report_id in statuses if report_id not in found]
+            restored = await restore_archived_reports(
+                mongo.db.bullying_reports, mongo.db.bullying_reports_archive,
+                {report_id: {"status": statuses[report_id], "updated_at": updated_at} for report_id in missing},
+            )
+        if result.modified_count or restored:
+            await mark_reports_changed()
+
+        restored_ids = {report['id'] for report in restored}
+        for report in restored:
+            publish_report_event("report_created", BullyingReport(**parse_from_mongo(report)).dict())
+        for report_id, status in statuses.items():
+            if report_id not in missing:
+                publish_report_event("status_changed", {"id": report_id, "status": status, "updated_at": updated_at})
+
+        return ReportStatusBatchResult(
+            matched=result.matched_count + len(restored),
+            modified=result.modified_count + len(restored),
+            not_found=[report_id for report_id in missing if report_id not in restored_ids]
+        )
+    except Exception as e:
+        logging.error(f"Error updating report statuses in batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update report statuses")
+
+
+@api_router.post("/reports/batch-get", response_model=ReportBatchGetResult)
+async def batch_get_reports(request: ReportBatchGetRequest, projection: dict = Depends(report_projection)):
+    """Fetch many reports by id in one round trip (admin only)
+
+    Results follow the order of the requested ids, repeats included; ids that
+    match no report come back with found=false and are listed in not_found.
+    Reports the archiver has moved are looked up there with a second query,
+    only when some ids are missing from the hot collection.
+    """
+    if len(request.ids) > BATCH_GET_MAX_IDS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_GET_MAX_IDS} ids per request")
+
+    ids = list(dict.fromkeys(request.ids))
+    projection = {**projection, "id": 1}
+    try:
+        reports = {}
+        for collection in report_collections(include_archived=True):
+            missing = [report_id for report_id in ids if report_id not in reports]
+            if not missing:
+                break
+            async for report in collection.find({"id": {"$in": missing}}, projection):
+                reports[report["id"]] = parse_from_mongo(report)
+
+        results = [
+            {"id": report_id, "found": report_id in reports, "report": reports.get(report_id)}
+            for report_id in request.ids
+        ]
+        not_found = [report_id for report_id in ids if report_id not in reports]
+        return TrustedJSONResponse({"results": results, "not_found": not_found})
+    except Exception as e:
+        logging.error(f"Error fetching reports in batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch reports")
+
+
 @api_router.get("/reports/stats/summary")
-async def get_reports_summary():
-    """Get summary statistics of reports"""
-    try:
-        total_reports = await db.bullying_reports.count_documents({})
-        pending_reports = await db.bullying_reports.count_documents({"status": "pending"})
-        in_progress_reports = await db.bullying_reports.count_documents({"status": "in_progress"})
-        resolved_reports = await db.bullying_reports.count_documents({"status": "resolved"})
-        anonymous_reports = await db.bullying_reports.count_documents({"is_anonymous": True})
-        
-        return {
-            "total_reports": total_reports,
-            "pending_reports": pending_reports,
-            "in_progress_reports": in_progress_reports,
-            "resolved_reports": resolved_reports,
-            "anonymous_reports": anonymous_reports
-        }
+async def get_reports_summary(
+    request: Request, etag: str = Depends(conditional_etag), include_archived: bool = False
+):
+    """Get summary statistics of reports; archived ones count only with include_archived=true"""
+    try:
+        summary = await cached_reports_summary(request.state.reports_version, include_archived)
+        return TrustedJSONResponse(summary, headers=etag_headers(etag))
     except Exception as e:
         logging.error(f"Error fetching reports summary: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch reports summary")
 
 
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def start_analytics_pool():
+    global analytics_pool
+    # Spawned rather than forked: the children only import analytics.py and
+    # never inherit the event loop or the Mongo client's threads
+    analytics_pool = ProcessPoolExecutor(ANALYTICS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    # Start the workers and import pandas now rather than on the first request
+    analytics_pool.submit(build_analytics, {field: [] for field in ANALYTICS_FIELDS})
+
+
+def stop_analytics_pool():
+    global analytics_pool
+    analytics_pool.shutdown(cancel_futures=True)
+    analytics_pool = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db = mongo.connect(event_listeners=[CommandMetrics(metrics)])
+    try:
+        await ensure_indexes(db)
+        await ensure_ttl_index(db, "status_checks", "timestamp", STATUS_CHECK_TTL_SECONDS)
+        if await has_legacy_dates(db):
+            logger.error(
+                "Some reports still store created_at/updated_at as strings. Date filters, pages after the "
+                "first, /reports/changes and the archiver skip them: run `python manage.py migrate-dates`"
+            )
+    except Exception as e:
+        logger.error(f"Error preparing the database: {e}")
+
+    status_check_buffer.start(db.status_checks)
+    if EVENTS_SOURCE != "local":
+        task = asyncio.create_task(
+            watch_report_changes(db.bullying_reports, report_events, REPORT_FIELDS, on_change=reports_changed_elsewhere),
+            name="report_watcher",
+        )
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+    if ARCHIVE_INTERVAL > 0:
+        task = asyncio.create_task(
+            archive_periodically(
+                db.bullying_reports, db.bullying_reports_archive, timedelta(days=ARCHIVE_AFTER_DAYS),
+                ARCHIVE_BATCH_SIZE, ARCHIVE_INTERVAL, on_archived=reports_archived,
+            ),
+            name="report_archiver",
+        )
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+    start_analytics_pool()
+
+    yield
+
+    await status_check_buffer.stop()
+    for task in list(background_tasks):
+        task.cancel()
+    stop_analytics_pool()
+    mongo.close()
+
+
+# Create the main app without a prefix
+app = FastAPI(lifespan=lifespan)
+
 # Include the router in the main app
 app.include_router(api_router)
 
+
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers=etag_headers(exc.etag))
+
+
+app.add_middleware(MetricsMiddleware, registry=metrics, untimed_routes=["/api/reports/events"])
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Next-Offset", "Content-Range"],
 )
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
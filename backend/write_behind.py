@@ -0,0 +1,90 @@
+"""Write-behind buffering for high-volume, low-value inserts"""
+import asyncio
+import logging
+
+from pymongo.errors import BulkWriteError
+
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehindBuffer:
+    """Collect documents in memory and insert them in periodic batches
+
+    A flush happens when flush_size documents are waiting or flush_interval
+    seconds have passed, whichever comes first, as one unordered
+    insert_many. Documents from a failed flush are retried with the next
+    batch, keeping their _id, so one that was stored after all is
+    recognised by its duplicate key error and dropped. Beyond max_pending
+    the oldest ones are dropped, so an outage cannot grow memory without
+    bound. stop() drains what is left.
+    """
+
+    def __init__(self, flush_size: int = 100, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.collection = None
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = []
+        self.dropped = 0
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.closing = False
+
+    def add(self, document):
+        """Queue a document; call only between start() and stop()"""
+        self.pending.append(document)
+        if len(self.pending) > self.max_pending:
+            overflow = len(self.pending) - self.max_pending
+            del self.pending[:overflow]
+            self.dropped += overflow
+            logger.warning(f"Write-behind buffer for {self.collection.name} full, dropped {overflow} documents")
+        if len(self.pending) >= self.flush_size:
+            self.wakeup.set()
+
+    async def flush(self):
+        if not self.pending:
+            return 0
+        batch, self.pending = self.pending, []
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+            return len(batch)
+        except BulkWriteError as e:
+            # insert_many stamped an _id on every document, so a retried
+            # document that was stored after all fails with a duplicate key:
+            # it is done. Only the documents that really failed go back.
+            failed = [error for error in e.details.get('writeErrors', []) if error.get('code') != DUPLICATE_KEY]
+            if failed:
+                logger.error(f"{len(failed)} of {len(batch)} documents failed to flush to {self.collection.name}")
+            self.pending[:0] = [batch[error['index']] for error in failed]
+            return len(batch) - len(e.details.get('writeErrors', []))
+        except Exception as e:
+            logger.error(f"Error flushing {len(batch)} documents to {self.collection.name}: {e}")
+            self.pending[:0] = batch
+            return 0
+
+    async def run(self):
+        while not self.closing:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    def start(self, collection):
+        self.collection = collection
+        self.closing = False
+        if self.task is None:
+            self.task = asyncio.create_task(self.run(), name=f"write_behind_{self.collection.name}")
+
+    async def stop(self):
+        """Stop the flush loop after a final flush of everything still pending"""
+        self.closing = True
+        self.wakeup.set()
+        if self.task is not None:
+            await self.task
+            self.task = None
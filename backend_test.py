@@ -6,7 +6,10 @@ Tests all API endpoints for the anti-bullying reporting system
 
 import requests
 import sys
+import csv
+import io
 import json
+import time
 from datetime import datetime, date
 from typing import Dict, Any
 
@@ -47,6 +50,74 @@ class CiceroBullyingAPITester:
         except Exception as e:
             return self.log_test("Health Check", False, f"- Error: {str(e)}")
 
+    def test_readiness(self):
+        """Test GET /api/health/live and /api/health/ready"""
+        try:
+            live = requests.get(f"{self.api_url}/health/live", timeout=10)
+            ready = requests.get(f"{self.api_url}/health/ready", timeout=10)
+            
+            if live.status_code == 200 and ready.status_code == 200:
+                data = ready.json()
+                if "ping_ms" in data.get("mongo", {}) and "checked_out" in data.get("pool", {}):
+                    return self.log_test("Health Probes", True, f"- Ping: {data['mongo']['ping_ms']}ms")
+                else:
+                    return self.log_test("Health Probes", False, f"- Missing ping or pool stats: {data}")
+            else:
+                return self.log_test("Health Probes", False, f"- Live: {live.status_code}, Ready: {ready.status_code}")
+                
+        except Exception as e:
+            return self.log_test("Health Probes", False, f"- Error: {str(e)}")
+
+    def test_status_checks(self):
+        """Test POST/GET /api/status - Batched heartbeats, newest first with cursor paging
+
+        Heartbeats are written behind in batches (HEARTBEAT_FLUSH_INTERVAL,
+        1s by default), so the test waits past a flush before reading.
+        """
+        client_name = f"backend-test-{datetime.now().timestamp()}"
+        try:
+            posted = []
+            for _ in range(3):
+                response = requests.post(f"{self.api_url}/status", json={"client_name": client_name}, timeout=10)
+                if response.status_code != 200:
+                    return self.log_test("Status Checks", False, f"- POST status: {response.status_code}")
+                posted.append(response.json()["id"])
+                time.sleep(0.01)
+            time.sleep(2.5)
+
+            pages = []
+            params = {"limit": 2}
+            for _ in range(10):
+                response = requests.get(f"{self.api_url}/status", params=params, timeout=10)
+                if response.status_code != 200:
+                    return self.log_test("Status Checks", False, f"- GET status: {response.status_code}")
+                page = response.json()
+                if len(page) > 2:
+                    return self.log_test("Status Checks", False, f"- Limit ignored, got {len(page)} heartbeats")
+                pages.append(page)
+                seen = [check["id"] for p in pages for check in p if check["client_name"] == client_name]
+                next_cursor = response.headers.get("X-Next-Cursor")
+                if len(seen) == len(posted) or not next_cursor:
+                    break
+                params = {"limit": 2, "cursor": next_cursor}
+
+            if seen != posted[::-1]:
+                return self.log_test("Status Checks", False, f"- Expected the heartbeats newest first, got {seen}")
+            if len(pages) < 2:
+                return self.log_test("Status Checks", False, f"- Three heartbeats fit on one page of two")
+            timestamps = [datetime.fromisoformat(check["timestamp"]) for p in pages for check in p]
+            if timestamps != sorted(timestamps, reverse=True):
+                return self.log_test("Status Checks", False, f"- Pages are not in newest-first order")
+
+            response = requests.get(f"{self.api_url}/status", params={"cursor": "invalid"}, timeout=10)
+            if response.status_code != 400:
+                return self.log_test("Status Checks", False, f"- Invalid cursor should return 400, got {response.status_code}")
+
+            return self.log_test("Status Checks", True, f"- Batched write visible, {len(pages)} pages newest first")
+
+        except Exception as e:
+            return self.log_test("Status Checks", False, f"- Error: {str(e)}")
+
     def test_create_report_identified(self):
         """Test POST /api/reports - Create identified bullying report"""
         report_data = {
@@ -144,6 +215,110 @@ class CiceroBullyingAPITester:
         except Exception as e:
             return self.log_test("Get All Reports", False, f"- Error: {str(e)}")
 
+    def test_paginated_reports(self):
+        """Test GET /api/reports with limit, cursor and filters"""
+        try:
+            response = requests.get(f"{self.api_url}/reports", params={"limit": 1}, timeout=10)
+            if response.status_code != 200:
+                return self.log_test("Paginated Reports", False, f"- Status: {response.status_code}")
+            
+            first_page = response.json()
+            next_cursor = response.headers.get("X-Next-Cursor")
+            if len(first_page) > 1:
+                return self.log_test("Paginated Reports", False, f"- Limit ignored, got {len(first_page)} reports")
+            
+            if next_cursor:
+                response = requests.get(f"{self.api_url}/reports", params={"limit": 1, "cursor": next_cursor}, timeout=10)
+                second_page = response.json()
+                if response.status_code != 200 or (second_page and second_page[0]["id"] == first_page[0]["id"]):
+                    return self.log_test("Paginated Reports", False, f"- Cursor did not advance")
+            
+            response = requests.get(f"{self.api_url}/reports", params={"is_anonymous": "true"}, timeout=10)
+            if response.status_code != 200 or not all(r["is_anonymous"] for r in response.json()):
+                return self.log_test("Paginated Reports", False, f"- is_anonymous filter not applied")
+            
+            response = requests.get(f"{self.api_url}/reports", params={"cursor": "invalid"}, timeout=10)
+            if response.status_code != 400:
+                return self.log_test("Paginated Reports", False, f"- Invalid cursor should return 400, got {response.status_code}")
+            
+            return self.log_test("Paginated Reports", True, f"- Cursor and filters working")
+                
+        except Exception as e:
+            return self.log_test("Paginated Reports", False, f"- Error: {str(e)}")
+
+    def test_report_list_views(self):
+        """Test GET /api/reports with view=summary and sparse fields"""
+        try:
+            response = requests.get(f"{self.api_url}/reports", params={"view": "summary", "limit": 5}, timeout=10)
+            if response.status_code != 200:
+                return self.log_test("Report List Views", False, f"- Summary status: {response.status_code}")
+            if any("description" in r or "description_preview" not in r for r in response.json()):
+                return self.log_test("Report List Views", False, f"- Summary view should only carry description_preview")
+            
+            response = requests.get(f"{self.api_url}/reports", params={"fields": "status,class_name", "limit": 5}, timeout=10)
+            if response.status_code != 200:
+                return self.log_test("Report List Views", False, f"- Fields status: {response.status_code}")
+            if any(set(r) != {"id", "created_at", "status", "class_name"} for r in response.json()):
+                return self.log_test("Report List Views", False, f"- Sparse fieldset not applied")
+            
+            response = requests.get(f"{self.api_url}/reports", params={"fields": "password"}, timeout=10)
+            if response.status_code != 400:
+                return self.log_test("Report List Views", False, f"- Unknown field should return 400, got {response.status_code}")
+            
+            return self.log_test("Report List Views", True, f"- Summary view and sparse fields working")
+                
+        except Exception as e:
+            return self.log_test("Report List Views", False, f"- Error: {str(e)}")
+
+    def test_search_reports(self):
+        """Test GET /api/reports/search - Accent-insensitive full-text search"""
+        try:
+            # "patio" without accent must match the "Pátio da escola" report created earlier
+            response = requests.get(f"{self.api_url}/reports/search", params={"q": "patio"}, timeout=10)
+            if response.status_code != 200:
+                return self.log_test("Search Reports", False, f"- Status: {response.status_code}")
+            
+            data = response.json()
+            if self.created_report_id and self.created_report_id not in [r["id"] for r in data]:
+                return self.log_test("Search Reports", False, f"- Created report not found by accent-free query")
+            if any("score" not in r for r in data):
+                return self.log_test("Search Reports", False, f"- Results missing relevance score")
+            
+            response = requests.get(f"{self.api_url}/reports/search", params={"q": "patio", "bullying_type": "physical"}, timeout=10)
+            if response.status_code != 200 or any(r["bullying_type"] != "physical" for r in response.json()):
+                return self.log_test("Search Reports", False, f"- bullying_type filter not applied")
+            
+            return self.log_test("Search Reports", True, f"- Found {len(data)} reports for 'patio'")
+                
+        except Exception as e:
+            return self.log_test("Search Reports", False, f"- Error: {str(e)}")
+
+    def test_export_reports(self):
+        """Test GET /api/reports/export - Stream reports as NDJSON and CSV"""
+        try:
+            response = requests.get(f"{self.api_url}/reports/export", params={"format": "ndjson"}, timeout=30)
+            if response.status_code != 200:
+                return self.log_test("Export Reports", False, f"- NDJSON status: {response.status_code}")
+            
+            rows = [json.loads(line) for line in response.text.splitlines() if line]
+            if rows and "id" not in rows[0]:
+                return self.log_test("Export Reports", False, f"- NDJSON rows missing id")
+            
+            response = requests.get(f"{self.api_url}/reports/export", params={"format": "csv"}, timeout=30)
+            if response.status_code != 200 or not response.text.startswith("id,"):
+                return self.log_test("Export Reports", False, f"- CSV status: {response.status_code}")
+            
+            # Cells a spreadsheet would evaluate as formulas must be escaped
+            cells = [cell for row in csv.reader(io.StringIO(response.text)) for cell in row]
+            formulas = [cell for cell in cells if cell[:1] in ("=", "+", "-", "@")]
+            if formulas:
+                return self.log_test("Export Reports", False, f"- Unescaped formula cells: {formulas[:3]}")
+            
+            return self.log_test("Export Reports", True, f"- Exported {len(rows)} reports")
+                
+        except Exception as e:
+            return self.log_test("Export Reports", False, f"- Error: {str(e)}")
+
     def test_get_single_report(self):
         """Test GET /api/reports/{id} - Get specific report"""
         if not self.created_report_id:
@@ -194,6 +369,95 @@ class CiceroBullyingAPITester:
         except Exception as e:
             return self.log_test("Update Report Status", False, f"- Error: {str(e)}")
 
+    def test_batch_status_update(self):
+        """Test PATCH /api/reports/status - Batch status changes"""
+        if not self.created_report_id:
+            return self.log_test("Batch Status Update", False, "- No report ID available")
+        
+        missing_id = "00000000-0000-0000-0000-000000000000"
+        try:
+            response = requests.patch(
+                f"{self.api_url}/reports/status",
+                json=[
+                    {"id": self.created_report_id, "status": "resolved"},
+                    {"id": missing_id, "status": "resolved"}
+                ],
+                headers={"Content-Type": "application/json"},
+                timeout=10
+            )
+            
+            if response.status_code != 200:
+                return self.log_test("Batch Status Update", False, f"- Status: {response.status_code}")
+            
+            data = response.json()
+            if data.get("matched") == 1 and data.get("not_found") == [missing_id]:
+                return self.log_test("Batch Status Update", True, f"- Matched: {data.get('matched')}, Not found: {len(data.get('not_found'))}")
+            else:
+                return self.log_test("Batch Status Update", False, f"- Unexpected result: {data}")
+                
+        except Exception as e:
+            return self.log_test("Batch Status Update", False, f"- Error: {str(e)}")
+
+    def test_report_changes(self):
+        """Test GET /api/reports/changes - Delta sync from a watermark
+
+        Changes are held back until CHANGES_SETTLE_SECONDS old (1s by
+        default), so the test waits past that before each read.
+        """
+        if not self.created_report_id:
+            return self.log_test("Report Changes", False, "- No report ID available")
+
+        settle_wait = 2.5
+        try:
+            # Catch up to the current watermark before making a change
+            time.sleep(settle_wait)
+            watermark = None
+            for _ in range(50):
+                params = {"limit": 1000, **({"since": watermark} if watermark else {})}
+                response = requests.get(f"{self.api_url}/reports/changes", params=params, timeout=30)
+                if response.status_code != 200:
+                    return self.log_test("Report Changes", False, f"- Status: {response.status_code}")
+                data = response.json()
+                watermark = data.get("watermark")
+                if not data.get("has_more"):
+                    break
+            if not watermark:
+                return self.log_test("Report Changes", False, f"- No watermark returned: {data}")
+
+            response = requests.put(
+                f"{self.api_url}/reports/{self.created_report_id}/status",
+                json={"status": "in_progress"},
+                headers={"Content-Type": "application/json"},
+                timeout=10
+            )
+            if response.status_code != 200:
+                return self.log_test("Report Changes", False, f"- Status update failed: {response.status_code}")
+
+            time.sleep(settle_wait)
+            response = requests.get(f"{self.api_url}/reports/changes", params={"since": watermark}, timeout=10)
+            if response.status_code != 200:
+                return self.log_test("Report Changes", False, f"- Status: {response.status_code}")
+            data = response.json()
+            changed = [(r["id"], r["status"]) for r in data.get("reports", [])]
+            if changed != [(self.created_report_id, "in_progress")] or data.get("has_more"):
+                return self.log_test("Report Changes", False, f"- Expected only the updated report, got {changed}")
+            new_watermark = data.get("watermark")
+            if not new_watermark or new_watermark == watermark:
+                return self.log_test("Report Changes", False, f"- Watermark did not advance")
+
+            response = requests.get(f"{self.api_url}/reports/changes", params={"since": new_watermark}, timeout=10)
+            if response.status_code != 200 or response.json().get("reports"):
+                return self.log_test("Report Changes", False, f"- Change returned again after the new watermark")
+
+            response = requests.get(f"{self.api_url}/reports/changes", params={"since": "invalid"}, timeout=10)
+            if response.status_code != 400:
+                return self.log_test("Report Changes", False, f"- Invalid watermark should return 400, got {response.status_code}")
+
+            return self.log_test("Report Changes", True, f"- Update returned once, watermark advanced")
+
+        except Exception as e:
+            return self.log_test("Report Changes", False, f"- Error: {str(e)}")
+
     def test_get_summary_stats(self):
         """Test GET /api/reports/stats/summary - Get statistics"""
         try:
@@ -202,7 +466,8 @@ class CiceroBullyingAPITester:
             
             if success:
                 data = response.json()
-                expected_fields = ["total_reports", "pending_reports", "in_progress_reports", "resolved_reports", "anonymous_reports"]
+                expected_fields = ["total_reports", "pending_reports", "in_progress_reports", "resolved_reports", "anonymous_reports",
+                                   "by_bullying_type", "by_class_name", "by_location"]
                 missing_fields = [field for field in expected_fields if field not in data]
                 
                 if not missing_fields:
@@ -215,6 +480,23 @@ class CiceroBullyingAPITester:
         except Exception as e:
             return self.log_test("Get Summary Stats", False, f"- Error: {str(e)}")
 
+    def test_conditional_get(self):
+        """Test ETag / If-None-Match on the summary endpoint"""
+        try:
+            response = requests.get(f"{self.api_url}/reports/stats/summary", timeout=10)
+            etag = response.headers.get("ETag")
+            if response.status_code != 200 or not etag:
+                return self.log_test("Conditional GET", False, f"- Missing ETag, status: {response.status_code}")
+            
+            response = requests.get(f"{self.api_url}/reports/stats/summary", headers={"If-None-Match": etag}, timeout=10)
+            if response.status_code == 304:
+                return self.log_test("Conditional GET", True, f"- Unchanged summary answered with 304")
+            else:
+                return self.log_test("Conditional GET", False, f"- Expected 304, got {response.status_code}")
+                
+        except Exception as e:
+            return self.log_test("Conditional GET", False, f"- Error: {str(e)}")
+
     def test_bullying_types_validation(self):
         """Test all bullying types are accepted"""
         bullying_types = ["verbal", "physical", "psychological", "cyberbullying", "sexual", "social_exclusion", "other"]
@@ -247,6 +529,264 @@ class CiceroBullyingAPITester:
         
         return self.log_test("Bullying Types Validation", True, f"- All {len(bullying_types)} types accepted")
 
+    def test_bulk_report_creation(self):
+        """Test POST /api/reports/bulk - Per-item results for a mixed batch"""
+        valid_report = {
+            "name": None,
+            "age": 13,
+            "class_name": "8º A",
+            "bullying_type": "social_exclusion",
+            "date_occurred": "2024-02-01",
+            "location": "Quadra",
+            "description": "Relato importado de formulário em papel.",
+            "is_anonymous": True
+        }
+        
+        try:
+            response = requests.post(
+                f"{self.api_url}/reports/bulk",
+                json=[valid_report, {"name": "Sem idade"}, valid_report],
+                headers={"Content-Type": "application/json"},
+                timeout=30
+            )
+            
+            if response.status_code != 200:
+                return self.log_test("Bulk Report Creation", False, f"- Status: {response.status_code}")
+            
+            data = response.json()
+            results = data.get("results", [])
+            if (data.get("inserted") == 2 and data.get("failed") == 1 and results[1].get("errors") and results[0].get("id")
+                    and data.get("truncated") is False):
+                return self.log_test("Bulk Report Creation", True, f"- Inserted: {data.get('inserted')}, Failed: {data.get('failed')}")
+            else:
+                return self.log_test("Bulk Report Creation", False, f"- Unexpected result: {data}")
+                
+        except Exception as e:
+            return self.log_test("Bulk Report Creation", False, f"- Error: {str(e)}")
+
+    def test_duplicate_detection(self):
+        """Test that a resubmitted incident is flagged and listed by GET /api/reports/{id}/similar"""
+        report = {
+            "name": None,
+            "age": 12,
+            "class_name": "6º C",
+            "bullying_type": "verbal",
+            "date_occurred": "2024-03-04",
+            "location": "Corredor",
+            "description": "Um grupo de alunos me xinga no corredor toda vez que eu passo para a aula de educação física.",
+            "is_anonymous": True
+        }
+        copy = {**report, "description": "um grupo de alunos me xinga no corredor toda vez que passo para a aula de educacao fisica"}
+        
+        try:
+            first = requests.post(f"{self.api_url}/reports", json=report, timeout=10).json()
+            second = requests.post(f"{self.api_url}/reports", json=copy, timeout=10).json()
+            if first["id"] not in second.get("possible_duplicates", []):
+                return self.log_test("Duplicate Detection", False, f"- Copy not flagged: {second.get('possible_duplicates')}")
+            
+            response = requests.get(f"{self.api_url}/reports/{first['id']}/similar", timeout=10)
+            similar = response.json() if response.status_code == 200 else []
+            if any(item["id"] == second["id"] and "minhash" not in item for item in similar):
+                return self.log_test("Duplicate Detection", True, f"- Similar reports: {len(similar)}")
+            else:
+                return self.log_test("Duplicate Detection", False, f"- Status: {response.status_code}, Response: {similar}")
+                
+        except Exception as e:
+            return self.log_test("Duplicate Detection", False, f"- Error: {str(e)}")
+
+    def collect_report_ids(self, params, max_pages=20):
+        """Follow X-Next-Cursor through a filtered listing and return every id in order"""
+        ids = []
+        cursor = None
+        for _ in range(max_pages):
+            page_params = {**params, "limit": 1000, "fields": "id"}
+            if cursor:
+                page_params["cursor"] = cursor
+            response = requests.get(f"{self.api_url}/reports", params=page_params, timeout=30)
+            response.raise_for_status()
+            ids.extend(report["id"] for report in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        return ids
+
+    def test_include_archived(self):
+        """Test include_archived=true against reports the archiver has actually moved
+
+        Needs a deployment where the archiver (or ``manage.py archive-reports``)
+        has run; otherwise the test is skipped rather than passed.
+        """
+        try:
+            hot = requests.get(f"{self.api_url}/reports/stats/summary", timeout=10).json()
+            everything = requests.get(f"{self.api_url}/reports/stats/summary?include_archived=true", timeout=10).json()
+            archived_count = everything["total_reports"] - hot["total_reports"]
+            if archived_count == 0:
+                print("⏭️  SKIP - Include Archived - No archived reports in this deployment")
+                return True
+            
+            hot_ids = set(self.collect_report_ids({"status": "resolved"}))
+            all_ids = self.collect_report_ids({"status": "resolved", "include_archived": "true"})
+            archived_ids = [report_id for report_id in all_ids if report_id not in hot_ids]
+            if archived_count < 0 or len(all_ids) != len(set(all_ids)) or not archived_ids:
+                return self.log_test("Include Archived", False, f"- Archived: {archived_count}, Listed: {len(all_ids)}, Unique: {len(set(all_ids))}, Archive only: {len(archived_ids)}")
+            
+            report = requests.get(f"{self.api_url}/reports/{archived_ids[0]}", timeout=10)
+            batch = requests.post(f"{self.api_url}/reports/batch-get", json={"ids": archived_ids[:1]}, timeout=10).json()
+            if report.status_code == 200 and report.json()["status"] == "resolved" and batch["results"][0]["found"]:
+                return self.log_test("Include Archived", True, f"- Archived: {archived_count}, Fetched archived report {archived_ids[0]}")
+            else:
+                return self.log_test("Include Archived", False, f"- Archived report {archived_ids[0]}: status {report.status_code}")
+                
+        except Exception as e:
+            return self.log_test("Include Archived", False, f"- Error: {str(e)}")
+
+    def test_reports_analytics(self):
+        """Test GET /api/reports/analytics - Weekly series, heatmap and age distribution"""
+        try:
+            response = requests.get(f"{self.api_url}/reports/analytics", timeout=30)
+            
+            if response.status_code == 200:
+                data = response.json()
+                heatmap = data.get("class_type_heatmap", {})
+                ages = data.get("age_distribution", {})
+                if (sum(map(sum, heatmap.get("counts", []))) == data.get("total_reports") == sum(ages.get("counts", []))
+                        and "weekly_by_type" in data):
+                    return self.log_test("Reports Analytics", True, f"- Reports: {data['total_reports']}, Weeks: {len(data['weekly_by_type']['weeks'])}")
+                else:
+                    return self.log_test("Reports Analytics", False, f"- Inconsistent totals: {data}")
+            else:
+                return self.log_test("Reports Analytics", False, f"- Status: {response.status_code}")
+                
+        except Exception as e:
+            return self.log_test("Reports Analytics", False, f"- Error: {str(e)}")
+
+    def test_report_attachments(self):
+        """Test attachment upload, listing and ranged download on /api/reports/{id}/attachments"""
+        if not self.created_report_id:
+            return self.log_test("Report Attachments", False, "- No report ID available for testing")
+        
+        report_id = self.created_report_id
+        png = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+        try:
+            response = requests.post(
+                f"{self.api_url}/reports/{report_id}/attachments",
+                files={"file": ("print.png", png, "image/png")},
+                timeout=30
+            )
+            if response.status_code != 201:
+                return self.log_test("Report Attachments", False, f"- Upload status: {response.status_code}")
+            attachment = response.json()
+            
+            rejected = requests.post(
+                f"{self.api_url}/reports/{report_id}/attachments",
+                files={"file": ("virus.png", b"MZ" + b"\x00" * 64, "image/png")},
+                timeout=30
+            )
+            listed = requests.get(f"{self.api_url}/reports/{report_id}/attachments", timeout=10).json()
+            partial = requests.get(
+                f"{self.api_url}/reports/{report_id}/attachments/{attachment['id']}",
+                headers={"Range": "bytes=0-7"},
+                timeout=30
+            )
+            
+            if (rejected.status_code == 415 and any(item["id"] == attachment["id"] for item in listed)
+                    and partial.status_code == 206 and partial.content == png[:8]):
+                return self.log_test("Report Attachments", True, f"- Size: {attachment['size']}, Range: {partial.headers.get('Content-Range')}")
+            else:
+                return self.log_test("Report Attachments", False, f"- Rejected: {rejected.status_code}, Range: {partial.status_code}")
+                
+        except Exception as e:
+            return self.log_test("Report Attachments", False, f"- Error: {str(e)}")
+
+    def test_batch_get_reports(self):
+        """Test POST /api/reports/batch-get - Requested order with not-found markers"""
+        if not self.created_report_id:
+            return self.log_test("Batch Get Reports", False, "- No report ID available")
+        
+        ids = ["does-not-exist", self.created_report_id]
+        try:
+            response = requests.post(f"{self.api_url}/reports/batch-get", json={"ids": ids}, timeout=10)
+            
+            if response.status_code == 200:
+                data = response.json()
+                results = data.get("results", [])
+                if ([item["id"] for item in results] == ids and not results[0]["found"] and results[1]["found"]
+                        and results[1]["report"]["id"] == self.created_report_id and data.get("not_found") == ids[:1]):
+                    return self.log_test("Batch Get Reports", True, f"- Found: {sum(item['found'] for item in results)}/{len(ids)}")
+                else:
+                    return self.log_test("Batch Get Reports", False, f"- Unexpected result: {data}")
+            else:
+                return self.log_test("Batch Get Reports", False, f"- Status: {response.status_code}")
+                
+        except Exception as e:
+            return self.log_test("Batch Get Reports", False, f"- Error: {str(e)}")
+
+    def test_report_events(self):
+        """Test GET /api/reports/events - SSE preamble and a report_created event after a POST"""
+        report_data = {
+            "name": None,
+            "age": 13,
+            "class_name": "7º C",
+            "bullying_type": "social_exclusion",
+            "date_occurred": "2024-02-10",
+            "location": "Refeitório",
+            "description": f"Teste do feed de eventos {datetime.now().isoformat()}: fui excluído da mesa no almoço.",
+            "is_anonymous": True
+        }
+        try:
+            with requests.get(f"{self.api_url}/reports/events", stream=True, timeout=(5, 20)) as stream:
+                content_type = stream.headers.get("Content-Type", "")
+                if stream.status_code != 200 or not content_type.startswith("text/event-stream"):
+                    return self.log_test("Report Events", False, f"- Status: {stream.status_code}, Content-Type: {content_type}")
+                
+                lines = stream.iter_lines(decode_unicode=True)
+                first = next(lines)
+                if not first.startswith("retry: "):
+                    return self.log_test("Report Events", False, f"- Stream does not open with a retry preamble: {first!r}")
+                
+                # The subscription exists once the headers are in, so this event cannot be missed
+                response = requests.post(f"{self.api_url}/reports", json=report_data, timeout=10)
+                if response.status_code != 200:
+                    return self.log_test("Report Events", False, f"- POST status: {response.status_code}")
+                report_id = response.json()["id"]
+                
+                event_type = None
+                deadline = time.monotonic() + 15
+                for line in lines:
+                    if line.startswith("event: "):
+                        event_type = line[len("event: "):]
+                    elif line.startswith("data: ") and event_type == "report_created":
+                        if json.loads(line[len("data: "):]).get("id") == report_id:
+                            return self.log_test("Report Events", True, f"- report_created received for {report_id}")
+                    if time.monotonic() > deadline:
+                        break
+                return self.log_test("Report Events", False, f"- No report_created event for {report_id}")
+                
+        except Exception as e:
+            return self.log_test("Report Events", False, f"- Error: {str(e)}")
+
+    def test_metrics(self):
+        """Test GET /api/metrics - Prometheus counters labelled by route template"""
+        try:
+            response = requests.get(f"{self.api_url}/metrics", timeout=10)
+            if response.status_code != 200:
+                return self.log_test("Metrics", False, f"- Status: {response.status_code}")
+            
+            lines = response.text.splitlines()
+            # Earlier tests fetched single reports, which must be labelled by template, not by id
+            templated = [line for line in lines if line.startswith("http_requests_total{") and 'route="/api/reports/{report_id}"' in line]
+            if not templated:
+                return self.log_test("Metrics", False, f"- No http_requests_total series for /api/reports/{{report_id}}")
+            if not any(line.startswith("# TYPE mongodb_commands_total counter") for line in lines):
+                return self.log_test("Metrics", False, f"- mongodb_commands_total missing")
+            if any(line.startswith("http_request_duration_seconds") and 'route="/api/reports/events"' in line for line in lines):
+                return self.log_test("Metrics", False, f"- Event streams distort the latency histogram")
+            
+            return self.log_test("Metrics", True, f"- {len(lines)} lines, route templates used")
+                
+        except Exception as e:
+            return self.log_test("Metrics", False, f"- Error: {str(e)}")
+
     def test_invalid_report_creation(self):
         """Test validation for invalid report data"""
         # Test missing required fields
@@ -272,6 +812,30 @@ class CiceroBullyingAPITester:
         except Exception as e:
             return self.log_test("Invalid Report Validation", False, f"- Error: {str(e)}")
 
+    def test_submission_rate_limit(self):
+        """Test that a flood of submissions from one client gets 429 with Retry-After
+
+        Sends invalid bodies: the admission check runs before validation, so
+        they spend the client's tokens without creating any report. Run last,
+        since it leaves this client's bucket empty.
+        """
+        try:
+            statuses = []
+            for _ in range(60):
+                response = requests.post(f"{self.api_url}/reports", json={}, timeout=10)
+                statuses.append(response.status_code)
+                if response.status_code in (429, 503):
+                    break
+            
+            retry_after = response.headers.get("Retry-After", "")
+            if response.status_code in (429, 503) and retry_after.isdigit() and int(retry_after) > 0 and set(statuses[:-1]) <= {422}:
+                return self.log_test("Submission Rate Limit", True, f"- {response.status_code} after {len(statuses)} requests, Retry-After: {retry_after}")
+            else:
+                return self.log_test("Submission Rate Limit", False, f"- Statuses: {sorted(set(statuses))}, Retry-After: {retry_after!r}")
+                
+        except Exception as e:
+            return self.log_test("Submission Rate Limit", False, f"- Error: {str(e)}")
+
     def run_all_tests(self):
         """Run all backend API tests"""
         print("🚀 Starting Cícero Sem Bullying Backend API Tests")
@@ -280,14 +844,32 @@ class CiceroBullyingAPITester:
         
         # Run tests in logical order
         self.test_health_check()
+        self.test_readiness()
+        self.test_status_checks()
         self.test_create_report_identified()
         self.test_create_report_anonymous()
         self.test_get_all_reports()
+        self.test_paginated_reports()
+        self.test_report_list_views()
+        self.test_search_reports()
+        self.test_export_reports()
         self.test_get_single_report()
         self.test_update_report_status()
+        self.test_batch_status_update()
+        self.test_report_changes()
         self.test_get_summary_stats()
+        self.test_conditional_get()
         self.test_bullying_types_validation()
         self.test_invalid_report_creation()
+        self.test_bulk_report_creation()
+        self.test_duplicate_detection()
+        self.test_include_archived()
+        self.test_reports_analytics()
+        self.test_report_attachments()
+        self.test_batch_get_reports()
+        self.test_report_events()
+        self.test_metrics()
+        self.test_submission_rate_limit()
         
         # Print summary
         print("=" * 60)
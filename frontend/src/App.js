@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import "./App.css";
 import { BrowserRouter, Routes, Route, Navigate } from "react-router-dom";
 import axios from "axios";
@@ -184,6 +184,7 @@ const ReportForm = ({ onBack }) => {
     description: '',
     is_anonymous: false
   });
+  const [attachments, setAttachments] = useState([]);
   const [isSubmitting, setIsSubmitting] = useState(false);
   const { toast } = useToast();
 
@@ -208,7 +209,26 @@ const ReportForm = ({ onBack }) => {
         name: formData.is_anonymous ? null : formData.name
       };
 
-      await axios.post(`${API}/reports`, submitData);
+      const response = await axios.post(`${API}/reports`, submitData);
+
+      // Evidence is uploaded after the report exists; a failed file does not lose the report
+      let failedAttachments = 0;
+      for (const file of attachments) {
+        const upload = new FormData();
+        upload.append('file', file);
+        try {
+          await axios.post(`${API}/reports/${response.data.id}/attachments`, upload);
+        } catch (uploadError) {
+          failedAttachments += 1;
+        }
+      }
+      if (failedAttachments > 0) {
+        toast({
+          title: "Alguns anexos não foram enviados",
+          description: "Envie apenas imagens (PNG, JPG, GIF, WebP) ou PDF de até 10 MB.",
+          variant: "destructive"
+        });
+      }
       
       toast({
         title: "Denúncia enviada com sucesso!",
@@ -226,12 +246,17 @@ const ReportForm = ({ onBack }) => {
         description: '',
         is_anonymous: false
       });
+      setAttachments([]);
 
       setTimeout(() => onBack(), 2000);
     } catch (error) {
+      const status = error.response?.status;
+      const busy = status === 429 || status === 503;
       toast({
         title: "Erro ao enviar denúncia",
-        description: "Ocorreu um erro. Tente novamente ou procure ajuda presencial.",
+        description: busy
+          ? "Muitas denúncias enviadas agora. Aguarde alguns instantes e tente novamente."
+          : "Ocorreu um erro. Tente novamente ou procure ajuda presencial.",
         variant: "destructive"
       });
     } finally {
@@ -362,6 +387,22 @@ const ReportForm = ({ onBack }) => {
               />
             </div>
 
+            {/* Evidence */}
+            <div className="space-y-2">
+              <Label htmlFor="attachments">Anexos (opcional)</Label>
+              <Input
+                id="attachments"
+                type="file"
+                multiple
+                accept="image/png,image/jpeg,image/gif,image/webp,application/pdf"
+                onChange={(e) => setAttachments(Array.from(e.target.files).slice(0, 5))}
+                className="border-gray-300 focus:border-orange-400"
+              />
+              <p className="text-xs text-gray-500">
+                Prints de tela ou documentos que ajudem a entender o ocorrido (até 5 arquivos de 10 MB).
+              </p>
+            </div>
+
             {/* Action Buttons */}
             <div className="flex space-x-4 pt-6">
               <Button
@@ -387,23 +428,95 @@ const ReportForm = ({ onBack }) => {
   );
 };
 
+// Filters offered on the dashboard; 'all' means the parameter is not sent
+const emptyFilters = { status: 'all', bullying_type: 'all', class_name: '' };
+// Typing pause before the class filter is applied, so each keystroke is not a request
+const CLASS_FILTER_DELAY_MS = 400;
+
+const filterParams = (filters) => {
+  const params = {};
+  if (filters.status !== 'all') params.status = filters.status;
+  if (filters.bullying_type !== 'all') params.bullying_type = filters.bullying_type;
+  if (filters.class_name.trim()) params.class_name = filters.class_name.trim();
+  return params;
+};
+
+const matchesFilters = (report, filters) => (
+  Object.entries(filterParams(filters)).every(([key, value]) => report[key] === value)
+);
+
 // Admin Dashboard Component
 const AdminDashboard = () => {
   const [reports, setReports] = useState([]);
   const [summary, setSummary] = useState({});
   const [loading, setLoading] = useState(true);
+  const [filters, setFilters] = useState(emptyFilters);
+  const [classInput, setClassInput] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Server-sent events are subscribed once; they read the current filters from here
+  const filtersRef = useRef(filters);
+  // Bumped by every list reload; a response for an older number is stale and dropped
+  const listRequestRef = useRef(0);
   const { toast } = useToast();
 
   useEffect(() => {
+    filtersRef.current = filters;
+    // A cursor from the previous filters must not be combined with the new ones
+    setNextCursor(null);
     fetchReports();
+  }, [filters]);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setFilters((current) => (
+      current.class_name === classInput ? current : { ...current, class_name: classInput }
+    )), CLASS_FILTER_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [classInput]);
+
+  useEffect(() => {
     fetchSummary();
+
+    // Patch local state from server-sent deltas instead of re-downloading the list
+    const events = new EventSource(`${API}/reports/events`);
+    events.addEventListener('report_created', (event) => {
+      const report = JSON.parse(event.data);
+      if (!matchesFilters(report, filtersRef.current)) return;
+      setReports((current) => [report, ...current.filter((r) => r.id !== report.id)]);
+    });
+    events.addEventListener('status_changed', (event) => {
+      const change = JSON.parse(event.data);
+      setReports((current) => current.map((r) => (
+        r.id === change.id ? { ...r, status: change.status, updated_at: change.updated_at } : r
+      )).filter((r) => matchesFilters(r, filtersRef.current)));
+    });
+    events.addEventListener('reports_archived', (event) => {
+      const archived = new Set(JSON.parse(event.data).ids);
+      setReports((current) => current.filter((r) => !archived.has(r.id)));
+    });
+    events.addEventListener('summary', (event) => {
+      setSummary(JSON.parse(event.data));
+    });
+    const reload = () => {
+      fetchReports();
+      fetchSummary();
+    };
+    events.addEventListener('reports_imported', reload);
+    events.addEventListener('resync', reload);
+
+    return () => events.close();
   }, []);
 
+  // The list is paged: each response carries the next page's token in X-Next-Cursor
   const fetchReports = async () => {
+    const request = ++listRequestRef.current;
     try {
-      const response = await axios.get(`${API}/reports`);
+      const response = await axios.get(`${API}/reports`, { params: filterParams(filtersRef.current) });
+      if (request !== listRequestRef.current) return;
       setReports(response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
+      if (request !== listRequestRef.current) return;
       toast({
         title: "Erro ao carregar denúncias",
         description: "Não foi possível carregar as denúncias.",
@@ -414,6 +527,32 @@ const AdminDashboard = () => {
     }
   };
 
+  const loadMoreReports = async () => {
+    const request = listRequestRef.current;
+    setLoadingMore(true);
+    try {
+      const response = await axios.get(`${API}/reports`, {
+        params: { ...filterParams(filtersRef.current), cursor: nextCursor }
+      });
+      // The list was reloaded meanwhile: this page belongs to the old one
+      if (request !== listRequestRef.current) return;
+      setReports((current) => [
+        ...current,
+        ...response.data.filter((report) => !current.some((r) => r.id === report.id))
+      ]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      if (request !== listRequestRef.current) return;
+      toast({
+        title: "Erro ao carregar denúncias",
+        description: "Não foi possível carregar mais denúncias.",
+        variant: "destructive"
+      });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const fetchSummary = async () => {
     try {
       const response = await axios.get(`${API}/reports/stats/summary`);
@@ -425,12 +564,12 @@ const AdminDashboard = () => {
 
   const updateReportStatus = async (reportId, newStatus) => {
     try {
-      await axios.put(`${API}/reports/${reportId}/status`, { status: newStatus });
+      const response = await axios.put(`${API}/reports/${reportId}/status`, { status: newStatus });
       toast({
         title: "Status atualizado",
         description: "O status da denúncia foi atualizado com sucesso.",
       });
-      fetchReports();
+      setReports((current) => current.map((r) => (r.id === reportId ? response.data : r)));
       fetchSummary();
     } catch (error) {
       toast({
@@ -524,6 +663,40 @@ const AdminDashboard = () => {
         <Card className="bg-white shadow-xl">
           <CardHeader>
             <CardTitle className="text-2xl text-gray-800">Todas as Denúncias</CardTitle>
+            <div className="grid md:grid-cols-3 gap-4 pt-4">
+              <Select value={filters.status} onValueChange={(value) => setFilters((current) => ({...current, status: value}))}>
+                <SelectTrigger>
+                  <SelectValue placeholder="Status" />
+                </SelectTrigger>
+                <SelectContent>
+                  <SelectItem value="all">Todos os status</SelectItem>
+                  <SelectItem value="pending">Pendente</SelectItem>
+                  <SelectItem value="in_progress">Em Andamento</SelectItem>
+                  <SelectItem value="resolved">Resolvido</SelectItem>
+                </SelectContent>
+              </Select>
+              <Select value={filters.bullying_type} onValueChange={(value) => setFilters((current) => ({...current, bullying_type: value}))}>
+                <SelectTrigger>
+                  <SelectValue placeholder="Tipo" />
+                </SelectTrigger>
+                <SelectContent>
+                  <SelectItem value="all">Todos os tipos</SelectItem>
+                  <SelectItem value="verbal">Verbal</SelectItem>
+                  <SelectItem value="physical">Físico</SelectItem>
+                  <SelectItem value="psychological">Psicológico</SelectItem>
+                  <SelectItem value="cyberbullying">Cyberbullying</SelectItem>
+                  <SelectItem value="sexual">Assédio Sexual</SelectItem>
+                  <SelectItem value="social_exclusion">Exclusão Social</SelectItem>
+                  <SelectItem value="other">Outro</SelectItem>
+                </SelectContent>
+              </Select>
+              <Input
+                value={classInput}
+                onChange={(e) => setClassInput(e.target.value)}
+                placeholder="Turma (ex: 2º B)"
+                className="border-gray-300 focus:border-orange-400"
+              />
+            </div>
           </CardHeader>
           <CardContent>
             {reports.length === 0 ? (
@@ -542,7 +715,14 @@ const AdminDashboard = () => {
                             {report.age} anos • Turma: {report.class_name}
                           </p>
                         </div>
-                        {getStatusBadge(report.status)}
+                        <div className="flex items-center space-x-2">
+                          {report.possible_duplicates?.length > 0 && (
+                            <Badge variant="outline" className="text-orange-600 border-orange-300">
+                              Possível duplicata
+                            </Badge>
+                          )}
+                          {getStatusBadge(report.status)}
+                        </div>
                       </div>
                       
                       <div className="grid md:grid-cols-2 gap-4 mb-4">
@@ -609,6 +789,18 @@ const AdminDashboard = () => {
                 ))}
               </div>
             )}
+            {nextCursor && (
+              <div className="text-center pt-6">
+                <Button
+                  variant="outline"
+                  onClick={loadMoreReports}
+                  disabled={loadingMore}
+                  className="border-orange-300 text-orange-600 hover:bg-orange-50"
+                >
+                  {loadingMore ? 'Carregando...' : 'Carregar mais denúncias'}
+                </Button>
+              </div>
+            )}
           </CardContent>
         </Card>
       </main>